@@ -1,15 +1,47 @@
+import os
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
-from api.app.routers.prediction import router as prediction_router
-from api.app.utils.logging import init_logging, RequestContextMiddleware
+from prometheus_client import make_asgi_app
+from api.app.routers.prediction import router as prediction_router, BATCHER
+from api.app.services.model_loader import load_model
+from api.app.utils.logging import (
+    init_logging, shutdown_logging, RequestContextMiddleware
+)
 
 # Initialize logger first
 logger = init_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown hooks.
+    """
+    # Bound the worker threads running model inference so they match the
+    # sklearn/BLAS thread budget instead of anyio's default of 40
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.getenv("PRED_THREADS", 4))
+
+    # Load the model before serving so worker readiness implies model
+    # readiness and the first request does not pay the unpickling cost
+    load_model()
+
+    await BATCHER.start()
+    try:
+        yield
+    finally:
+        await BATCHER.stop()
+        shutdown_logging()
+
+
 # Initialize FastAPI app instance
 app = FastAPI(
     title="California Housing Model API",
     description="API for serving California Housing price predictions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Middleware for request ID, latency logging, and response header
@@ -19,6 +51,29 @@ app.add_middleware(RequestContextMiddleware, logger=logger)
 app.include_router(prediction_router, tags=["predictions"])
 
 
+class _ASGIEndpoint:
+    """
+    Wrap an ASGI app so a Route passes requests to it unchanged; Starlette
+    treats plain functions as request handlers instead.
+    """
+
+    def __init__(self, asgi_app):
+        self.asgi_app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        await self.asgi_app(scope, receive, send)
+
+
+# Prometheus scrape endpoint served by prometheus_client's ASGI app,
+# bypassing FastAPI routing and dependency handling. The route answers the
+# exact /metrics path (a mount alone would redirect it to /metrics/)
+metrics_app = make_asgi_app()
+app.add_route(
+    "/metrics", _ASGIEndpoint(metrics_app), methods=["GET"], include_in_schema=False
+)
+app.mount("/metrics", metrics_app)
+
+
 @app.get("/health")
 async def health_check():
     """
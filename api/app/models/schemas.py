@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class HousingFeatures(BaseModel):
@@ -15,11 +15,12 @@ class HousingFeatures(BaseModel):
     Latitude: float  # Block group latitude
     Longitude: float  # Block group longitude
 
-    class Config:
-        """
-        Pydantic configuration for the HousingFeatures model.
-        """
-        json_schema_extra = {
+    model_config = ConfigDict(
+        # Immutable once validated; handlers read attributes directly
+        frozen=True,
+        # Reject NaN/inf up front; inference skips sklearn's finiteness check
+        allow_inf_nan=False,
+        json_schema_extra={
             "example": {
                 "MedInc": 8.3252,
                 "HouseAge": 41.0,
@@ -30,7 +31,8 @@ class HousingFeatures(BaseModel):
                 "Latitude": 37.88,
                 "Longitude": -122.23
             }
-        }
+        },
+    )
 
 
 class PredictionResponse(BaseModel):
@@ -1,118 +1,233 @@
-from fastapi import APIRouter, HTTPException, Response, Depends, Request
+from fastapi import APIRouter, HTTPException
+import numpy as np
 import pandas as pd
 from api.app.models.schemas import HousingFeatures, PredictionResponse
+from api.app.services.batcher import PredictionBatcher
 from api.app.services.model_loader import load_model
-from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter
 import logging
+import math
+import os
+import threading
 import time
-from api.app.utils.logging import request_log_context, features_hash
+from functools import lru_cache
+from typing import Callable
+from cachetools import TTLCache
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import BaseDecisionTree
+from starlette.concurrency import run_in_threadpool
+from api.app.utils.logging import REQUEST_CONTEXT, hash_feature_values
 
 # Initialize APIRouter instance
 router = APIRouter()
 
 REQUEST_COUNT = Counter('prediction_requests', 'Total prediction requests')
 SUCCESS_COUNT = Counter('successful_predictions', 'Total successful predictions')
+CACHE_HIT = Counter('prediction_cache_hits', 'Predictions served from cache')
+CACHE_MISS = Counter('prediction_cache_misses', 'Predictions computed by the model')
+
+# Counter increments pre-bound once for the request hot path
+_count_request = REQUEST_COUNT.inc
+_count_success = SUCCESS_COUNT.inc
+_count_cache_hit = CACHE_HIT.inc
+_count_cache_miss = CACHE_MISS.inc
+
+# Recent predictions keyed by features hash; the lock guards concurrent access
+PRED_CACHE = TTLCache(
+    maxsize=int(os.getenv("PRED_CACHE_SIZE", 10000)),
+    ttl=int(os.getenv("PRED_CACHE_TTL", 300)),
+)
+PRED_CACHE_LOCK = threading.Lock()
+
+# Model input columns in training order (raw features + rooms_per_person)
+FEATURE_COLUMNS = pd.Index([
+    'MedInc', 'HouseAge', 'AveRooms', 'AveBedrms',
+    'Population', 'AveOccup', 'Latitude', 'Longitude',
+    'rooms_per_person',
+])
+
+# Model inputs are float32: trees evaluate in float32 anyway, and it halves
+# the memory traffic of the row buffers and batches
+INPUT_DTYPE = np.float32
+_INPUT_MAX = float(np.finfo(INPUT_DTYPE).max)
+
+# Per-thread input row reused across requests
+_buffers = threading.local()
 
 logger = logging.getLogger("app")
 
 
-@router.post("/predict", response_model=PredictionResponse)
-async def predict_housing_price(
-    features: HousingFeatures,
-    ctx: dict = Depends(request_log_context),
-    request: Request = None,
-):
+def _raw_feature_values(features: HousingFeatures) -> tuple:
     """
-    Predict housing price based on input features.
+    Raw request features in schema order.
     """
-    start = time.perf_counter()
-    REQUEST_COUNT.inc()
-
-    # Build features hash with ordered keys to be deterministic
-    ordered_keys = [
-                    'MedInc', 'HouseAge', 'AveRooms', 
-                    'AveBedrms', 'Population', 'AveOccup', 
-                    'Latitude', 'Longitude'
-                    ]
-    feat_dict = features.dict()
-    fhash = features_hash(feat_dict, ordered_keys=ordered_keys)
-
-    # Log request received
-    logger.info(
-        "prediction request received",
-        extra={
-            "event": "prediction_request_received",
-            "request_id": ctx.get("request_id"),
-            "client_ip": ctx.get("client_ip"),
-            "route": ctx.get("route"),
-            "method": ctx.get("method"),
-            "features_hash": fhash,
-        },
+    return (
+        features.MedInc, features.HouseAge, features.AveRooms,
+        features.AveBedrms, features.Population, features.AveOccup,
+        features.Latitude, features.Longitude,
     )
 
-    try:
-        # Load the cached model
-        model = load_model()
 
-        # Convert to DataFrame
-        df = pd.DataFrame([feat_dict])
+def _feature_values(features: HousingFeatures, raw: tuple) -> tuple:
+    """
+    Model input values for one request, in FEATURE_COLUMNS order.
+    """
+    # Feature engineering; zero Population raises ZeroDivisionError
+    return raw + (features.AveRooms / features.Population,)
+
+
+@lru_cache(maxsize=1)
+def _get_predictor() -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Build a predict function for the cached model that skips sklearn's
+    per-call input validation. Feature names are checked once here instead.
+    """
+    model = load_model()
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is not None and list(feature_names) != list(FEATURE_COLUMNS):
+        raise ValueError(
+            f"Model features {list(feature_names)} do not match "
+            f"API features {list(FEATURE_COLUMNS)}"
+        )
+
+    if isinstance(model, BaseDecisionTree):
+        # Skip dtype, finiteness and name checks; trees require float32
+        def predict(rows: np.ndarray) -> np.ndarray:
+            rows = np.ascontiguousarray(rows, dtype=np.float32)
+            return model.predict(rows, check_input=False)
+        return predict
+
+    if isinstance(model, LinearRegression):
+        # Same computation as LinearRegression.predict, minus check_array
+        coef_t, intercept = model.coef_.T, model.intercept_
+        return lambda rows: rows @ coef_t + intercept
+
+    if feature_names is not None:
+        return lambda rows: model.predict(
+            pd.DataFrame(rows, columns=FEATURE_COLUMNS, copy=False)
+        )
+    return model.predict
+
+
+def _predict_rows(rows: np.ndarray) -> np.ndarray:
+    """
+    Predict a 2-D array of feature rows with the cached model.
+    """
+    return _get_predictor()(rows)
+
 
-        # Feature engineering
-        df['rooms_per_person'] = df['AveRooms'] / df['Population']
+def _predict_sync(values: tuple) -> float:
+    """
+    Predict a single row without batching; executed in the worker threadpool.
+    """
+    row = getattr(_buffers, "row", None)
+    if row is None:
+        row = _buffers.row = np.empty((1, len(FEATURE_COLUMNS)), dtype=INPUT_DTYPE)
+    row[0] = values
+    return _predict_rows(row).item()
 
-        # Ensure expected column order
-        expected_columns = ['MedInc', 'HouseAge', 'AveRooms', 'AveBedrms',
-                            'Population', 'AveOccup', 'Latitude', 'Longitude',
-                            'rooms_per_person']
-        df = df[expected_columns]
 
-        # Make prediction
-        prediction = model.predict(df)
-        predicted_value = float(prediction)
+# Coalesces concurrent requests into one model call; started by the app lifespan
+BATCHER = PredictionBatcher(
+    _predict_rows,
+    max_batch=int(os.getenv("PRED_MAX_BATCH", 32)),
+    max_wait_ms=float(os.getenv("PRED_MAX_WAIT_MS", 1)),
+    dtype=INPUT_DTYPE,
+)
 
-        SUCCESS_COUNT.inc()
 
-        latency_ms = int((time.perf_counter() - start) * 1000)
+@router.post("/predict", response_model=PredictionResponse)
+async def predict_housing_price(features: HousingFeatures):
+    """
+    Predict housing price based on input features.
+    """
+    start_ns = time.perf_counter_ns()
+    _count_request()
+    # Populated by RequestContextMiddleware; empty if the path is excluded
+    ctx = REQUEST_CONTEXT.get({})
+
+    # Read attributes straight from the validated model; the hash covers the
+    # raw inputs in schema order, the engineered feature is not part of it
+    raw_values = _raw_feature_values(features)
+    fhash = hash_feature_values(raw_values)
+
+    # Only build log payloads when the level lets them through
+    if logger.isEnabledFor(logging.INFO):
         logger.info(
-            "prediction completed",
+            "prediction request received",
             extra={
-                "event": "prediction_completed",
-                "request_id": ctx.get("request_id"),
-                "client_ip": ctx.get("client_ip"),
-                "route": ctx.get("route"),
-                "method": ctx.get("method"),
-                "status_code": 200,
-                "latency_ms": latency_ms,
+                "event": "prediction_request_received",
+                **ctx,
                 "features_hash": fhash,
-                "predicted_value": predicted_value,
             },
         )
 
+    try:
+        # Serve repeated inputs without invoking the model
+        with PRED_CACHE_LOCK:
+            cached = PRED_CACHE.get(fhash)
+        if cached is not None:
+            _count_cache_hit()
+            _count_success()
+            return PredictionResponse(predicted_value=cached)
+        _count_cache_miss()
+
+        # Computed inside the handler so input errors get the error contract
+        values = _feature_values(features, raw_values)
+        # Finite values past the float32 range would reach the model as inf
+        if not all(abs(v) <= _INPUT_MAX for v in values):
+            raise ValueError("feature values exceed the float32 input range")
+
+        # Only the CPU-bound inference leaves the event loop
+        if BATCHER.running:
+            predicted_value = await BATCHER.submit(values)
+        else:
+            predicted_value = await run_in_threadpool(_predict_sync, values)
+
+        # Never cache or return a value the response cannot serialize
+        if not math.isfinite(predicted_value):
+            raise ValueError(
+                "model returned a non-finite prediction: " f"{predicted_value}"
+            )
+
+        with PRED_CACHE_LOCK:
+            PRED_CACHE[fhash] = predicted_value
+
+        _count_success()
+
+        if logger.isEnabledFor(logging.INFO):
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            logger.info(
+                "prediction completed",
+                extra={
+                    "event": "prediction_completed",
+                    **ctx,
+                    "status_code": 200,
+                    "latency_ms": latency_ms,
+                    "features_hash": fhash,
+                    "predicted_value": predicted_value,
+                },
+            )
+
         return PredictionResponse(predicted_value=predicted_value)
 
     except Exception as e:
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        logger.error(
-            "prediction failed",
-            extra={
-                "event": "prediction_failed",
-                "request_id": ctx.get("request_id"),
-                "client_ip": ctx.get("client_ip"),
-                "route": ctx.get("route"),
-                "method": ctx.get("method"),
-                "status_code": 500,
-                "latency_ms": latency_ms,
-                "features_hash": fhash,
-                "error": str(e),
-            },
-            exc_info=True,
-        )
+        if logger.isEnabledFor(logging.ERROR):
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            logger.error(
+                "prediction failed",
+                extra={
+                    "event": "prediction_failed",
+                    **ctx,
+                    "status_code": 500,
+                    "latency_ms": latency_ms,
+                    "features_hash": fhash,
+                    "error": str(e),
+                },
+                exc_info=True,
+            )
         raise HTTPException(
             status_code=500,
             detail=f"Prediction failed: {str(e)}"
         )
-
-
-@router.get("/metrics")
-def metrics():
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("app")
+
+
+class PredictionBatcher:
+    """
+    Coalesce concurrent single-row predictions into one model call.
+
+    Rows submitted while a batch is being collected (up to ``max_batch`` rows
+    or ``max_wait_ms`` after the first row) are stacked and passed to
+    ``predict_fn`` as one ``dtype`` array in a single call from the worker
+    threadpool; each caller then receives its own prediction.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch: int = 32,
+        max_wait_ms: float = 1.0,
+        dtype: np.dtype = np.float64,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.dtype = dtype
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Start the background batching task; a no-op when batching is disabled.
+        """
+        if self.max_batch <= 1 or self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background task and fail any predictions still queued.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("prediction batcher stopped"))
+
+    async def submit(self, row: Sequence[float]) -> float:
+        """
+        Queue one feature row and wait for its prediction.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _collect(self) -> Tuple[List[Sequence[float]], List[asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        row, future = await self._queue.get()
+        rows, futures = [row], [future]
+        deadline = loop.time() + self.max_wait
+        while len(rows) < self.max_batch:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    row, future = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                row, future = self._queue.get_nowait()
+            rows.append(row)
+            futures.append(future)
+        return rows, futures
+
+    async def _run(self) -> None:
+        while True:
+            rows, futures = await self._collect()
+            try:
+                batch = np.array(rows, dtype=self.dtype)
+                predictions = await run_in_threadpool(self.predict_fn, batch)
+            except asyncio.CancelledError:
+                for future in futures:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.error(
+                    "prediction batch failed",
+                    extra={"event": "prediction_batch_failed", "error": str(e)},
+                )
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for future, value in zip(futures, predictions.tolist()):
+                if not future.done():
+                    future.set_result(value)
@@ -7,40 +7,41 @@ import logging
 
 logger = logging.getLogger("app")
 
+# Optional joblib mmap mode (e.g. "r") so multiple workers share the pages of
+# large numpy arrays. Only applies to files written by joblib.dump without
+# compression; compressed PKLs and plain pickles (save_model's default copy
+# of MLflow's pickle) are loaded into memory as usual
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE") or None
+
+# Saved models directory, resolved from this file so it does not depend on CWD
+MODEL_DIR = Path(__file__).resolve().parents[2] / "models" / "saved_models"
+METADATA_PATH = MODEL_DIR / "california-housing-regressor_metadata.json"
+DEFAULT_MODEL_FILENAME = "california-housing-regressor_latest.pkl"
+
 
 @lru_cache(maxsize=1)
 def load_model():
     """
     Load the production-ready model from local file system.
     """
-    base_path = None
     model_path = None
     try:
-        # Define the base path for models (relative to /app root)
-        base_path = Path(os.path.join(os.getcwd(), "api", "models", "saved_models"))
-
-        # Load metadata to get model filename
-        metadata_path = base_path / "california-housing-regressor_metadata.json"
-
-        model_filename = ''
-        if metadata_path.exists():
-            with open(metadata_path, 'r') as f:
+        # Load metadata to get model filename; fall back if it is missing
+        try:
+            with open(METADATA_PATH, 'r') as f:
                 metadata = json.load(f)
-                model_filename = metadata.get(
-                    'model_filename', 'california-housing-regressor_latest.pkl'
-                )
-        else:
-            # Fallback if metadata missing
-            model_filename = 'california-housing-regressor_latest.pkl'
+            model_filename = metadata.get('model_filename', DEFAULT_MODEL_FILENAME)
+        except FileNotFoundError:
+            model_filename = DEFAULT_MODEL_FILENAME
 
         # Construct full model path
-        model_path = base_path / model_filename
-
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found at {model_path}")
+        model_path = MODEL_DIR / model_filename
 
         # Load the model using joblib
-        model = joblib.load(model_path)
+        try:
+            model = joblib.load(model_path, mmap_mode=MODEL_MMAP_MODE)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Model file not found at {model_path}")
 
         logger.info(
             "model loaded",
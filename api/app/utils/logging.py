@@ -1,19 +1,23 @@
 from __future__ import annotations
-import json
+import atexit
 import logging
 import os
+import queue
 import sys
 import time
 import uuid
-from datetime import datetime, timezone
-from hashlib import sha256
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from contextvars import ContextVar
+from functools import lru_cache
+from hashlib import blake2b
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+)
 from typing import Any, Dict
 from typing import Optional
 
+import orjson
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from pathlib import Path
 
 SERVICE_NAME = os.getenv("SERVICE_NAME", "california_housing_api")
@@ -24,35 +28,57 @@ LOG_FILE = os.path.join(LOG_DIR, "app.log")
 LOG_ROTATION = os.getenv("LOG_ROTATION", "size")  # "size" or "time"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
-# Default exclude paths: /health and /metrics; override via env var
+# Default exclude paths: /health and /metrics (mounted, so also served at
+# /metrics/); override via env var
 if os.getenv("LOG_EXCLUDE_PATHS"):
     obj = (p.strip() for p in os.getenv("LOG_EXCLUDE_PATHS").split(",") if p.strip())
-    EXCLUDE_PATHS = set(obj)
+    EXCLUDE_PATHS = frozenset(obj)
 else:
-    EXCLUDE_PATHS = {"/health", "/metrics"}
+    EXCLUDE_PATHS = frozenset({"/health", "/metrics", "/metrics/"})
+
+# Logging context of the in-flight request (request_id, client_ip, route,
+# method), set once by RequestContextMiddleware and read directly by routes
+REQUEST_CONTEXT: ContextVar[Dict[str, Any]] = ContextVar("request_context")
+
+
+# Fields identical for every record, merged into each payload
+_STATIC_FIELDS = {"service": SERVICE_NAME, "env": APP_ENV}
+
+# Optional record attributes (passed via ``extra``) copied into the payload
+_EXTRA_FIELDS = (
+    "request_id", "client_ip", "route", "method", "status_code",
+    "latency_ms", "event", "features_hash", "predicted_value", "error",
+    "model_path"
+)
+
+
+def _format_ts(created: float) -> str:
+    """
+    ISO-8601 UTC timestamp with microseconds, without building a datetime.
+    """
+    seconds = int(created)
+    micros = int((created - seconds) * 1_000_000)
+    prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+    return f"{prefix}.{micros:06d}+00:00"
 
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         payload: Dict[str, Any] = {
-            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "ts": _format_ts(record.created),
             "level": record.levelname,
-            "service": SERVICE_NAME,
-            "env": APP_ENV,
+            **_STATIC_FIELDS,
             "message": record.getMessage(),
         }
-        for key in (
-            "request_id", "client_ip", "route", "method", "status_code",
-            "latency_ms", "event", "features_hash", "predicted_value", "error",
-            "model_path"
-        ):
-            if hasattr(record, key):
-                payload[key] = getattr(record, key)
+        attrs = record.__dict__
+        for key in _EXTRA_FIELDS:
+            if key in attrs:
+                payload[key] = attrs[key]
         payload["logger"] = record.name
         if record.exc_info:
             obj = payload.get("error") or self.formatException(record.exc_info)
             payload["error"] = obj
-        return json.dumps(payload, ensure_ascii=False)
+        return orjson.dumps(payload, default=str).decode()
 
 
 def ensure_log_dir(path: str) -> None:
@@ -87,96 +113,179 @@ def build_stdout_handler() -> logging.Handler:
     return handler
 
 
+# Loggers routed through the background queue by init_logging
+_LOGGER_NAMES = ("app", "uvicorn", "uvicorn.error", "uvicorn.access")
+
+# Listener thread owning the file/stdout handlers, started by init_logging
+_listener: Optional[QueueListener] = None
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler for an in-process queue. Records are enqueued unformatted
+    so JSON formatting and I/O happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now; the caller may mutate them after logging returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def init_logging() -> logging.Logger:
+    global _listener
     logger = logging.getLogger("app")
     if not logger.handlers:
-        logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        level = getattr(logging, LOG_LEVEL, logging.INFO)
+        logger.setLevel(level)
         file_handler = build_file_handler()
         stdout_handler = build_stdout_handler()
-        logger.addHandler(file_handler)
-        logger.addHandler(stdout_handler)
+
+        # Request threads only enqueue; a listener thread formats and writes
+        log_queue = queue.SimpleQueue()
+        queue_handler = _LocalQueueHandler(log_queue)
+        _listener = QueueListener(
+            log_queue, file_handler, stdout_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        logger.addHandler(queue_handler)
         logger.propagate = False
 
         # Redirect uvicorn loggers to use same handlers
-        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        for name in _LOGGER_NAMES[1:]:
             ulogger = logging.getLogger(name)
             ulogger.handlers = []
-            ulogger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
-            ulogger.addHandler(file_handler)
-            ulogger.addHandler(stdout_handler)
+            ulogger.setLevel(level)
+            ulogger.addHandler(queue_handler)
             ulogger.propagate = False
     return logger
 
 
-def client_ip_from_request(request: Request) -> str:
-    xff = request.headers.get("x-forwarded-for")
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the background logging thread.
+    Records emitted afterwards are written synchronously.
+    """
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for name in _LOGGER_NAMES:
+        logging.getLogger(name).handlers = list(listener.handlers)
+
+
+def _extract_client_ip(scope: Scope) -> str:
+    """
+    Client IP from a single pass over the raw ASGI headers, preferring
+    X-Forwarded-For, then X-Real-IP, then the socket peer. The result is
+    cached in ``scope["state"]`` so later lookups in the request are free.
+    """
+    state = scope.setdefault("state", {})
+    cached = state.get("client_ip")
+    if cached is not None:
+        return cached
+
+    xff = xrip = None
+    for key, value in scope.get("headers", ()):
+        if key == b"x-forwarded-for":
+            if xff is None:
+                xff = value
+        elif key == b"x-real-ip":
+            if xrip is None:
+                xrip = value
+
     if xff:
         # Take first IP, strip spaces
-        return xff.split(",")[0].strip()
-    xrip = request.headers.get("x-real-ip")
-    if xrip:
-        return xrip.strip()
-    if request.client:
-        return request.client.host
-    return ""
+        client_ip = xff.split(b",")[0].strip().decode("latin-1")
+    elif xrip:
+        client_ip = xrip.strip().decode("latin-1")
+    elif scope.get("client"):
+        client_ip = scope["client"][0]
+    else:
+        client_ip = ""
+    state["client_ip"] = client_ip
+    return client_ip
+
+
+def client_ip_from_request(request: Request) -> str:
+    return _extract_client_ip(request.scope)
+
 
+def _header_value(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware assigning a request ID, echoing it in the
+    X-Request-ID response header and logging request latency.
+    """
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp, logger: logging.Logger):
-        super().__init__(app)
+        self.app = app
         self.logger = logger
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        request_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-        request.state.request_id = request_id
-        start = time.perf_counter()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Excluded paths (health checks, scrapes) skip all request bookkeeping
+        if scope["type"] != "http" or scope["path"] in EXCLUDE_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-        response = None
+        request_id = _header_value(scope, b"x-request-id") or str(uuid.uuid4())
+        ctx = {
+            "request_id": request_id,
+            "client_ip": _extract_client_ip(scope),
+            "route": scope["path"],
+            "method": scope["method"],
+        }
+        token = REQUEST_CONTEXT.set(ctx)
+        start_ns = time.perf_counter_ns()
         status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                ]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            latency_ms = int((time.perf_counter() - start) * 1000)
-            if response is not None:
-                response.headers["X-Request-ID"] = request_id
-
-            if path in EXCLUDE_PATHS:
-                return response
-
-            extra = {
-                "request_id": request_id,
-                "client_ip": client_ip_from_request(request),
-                "route": path,
-                "method": request.method,
-                "status_code": status_code,
-                "latency_ms": latency_ms,
-                "event": "request_completed",
-            }
-            self.logger.info("request completed", extra=extra)
-
-
-# Dependency to provide logging context in routes (Phase 2)
-async def request_log_context(request: Request) -> Dict[str, Any]:
-    ctx = {
-        "request_id": getattr(request.state, "request_id", None),
-        "client_ip": client_ip_from_request(request),
-        "route": request.url.path,
-        "method": request.method,
-    }
-    return ctx
+            REQUEST_CONTEXT.reset(token)
+            if self.logger.isEnabledFor(logging.INFO):
+                latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                extra = {
+                    **ctx,
+                    "status_code": status_code,
+                    "latency_ms": latency_ms,
+                    "event": "request_completed",
+                }
+                self.logger.info("request completed", extra=extra)
+
+
+@lru_cache(maxsize=4096)
+def hash_feature_values(values: tuple) -> str:
+    """
+    Features hash for values already in a deterministic order.
+    """
+    return blake2b(orjson.dumps(values), digest_size=8).hexdigest()
 
 
 # Privacy-safe features hash helper (Phase 2 utility, ready for Phase 3)
 def features_hash(
                     payload: Dict[str, Any], 
                     ordered_keys: Optional[list[str]] = None) -> str:
-    if ordered_keys:
-        data = {k: payload.get(k) for k in ordered_keys}
-    else:
-        # Sort keys to be deterministic
-        data = {k: payload[k] for k in sorted(payload.keys())}
-    as_json = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
-    return sha256(as_json.encode("utf-8")).hexdigest()[:16]
+    # Sort keys to be deterministic when no order is given
+    keys = ordered_keys if ordered_keys else sorted(payload)
+    return hash_feature_values(tuple(payload.get(k) for k in keys))
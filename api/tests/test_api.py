@@ -117,3 +117,149 @@ def test_empty_payload():
     
     # Assert that the status code is 422 Unprocessable Entity
     assert response.status_code == 422
+
+
+def test_repeated_prediction_served_from_cache():
+    """
+    Test that identical requests return the same cached prediction.
+    Verifies that the second request is answered from the prediction cache.
+    """
+    from prometheus_client import REGISTRY
+    from api.app.routers.prediction import PRED_CACHE
+
+    payload = {
+        "MedInc": 3.5,
+        "HouseAge": 20.0,
+        "AveRooms": 5.0,
+        "AveBedrms": 1.1,
+        "Population": 900.0,
+        "AveOccup": 3.0,
+        "Latitude": 34.05,
+        "Longitude": -118.25
+    }
+    PRED_CACHE.clear()
+
+    first = client.post("/predict", json=payload)
+    hits_before = REGISTRY.get_sample_value("prediction_cache_hits_total")
+    second = client.post("/predict", json=payload)
+
+    # Both requests succeed with the same value
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.json() == second.json()
+
+    # The second request did not reach the model
+    hits_after = REGISTRY.get_sample_value("prediction_cache_hits_total")
+    assert hits_after == hits_before + 1
+
+
+def test_request_id_header_echoed():
+    """
+    Test that the request ID is propagated to the response.
+    Verifies that a client-supplied X-Request-ID is returned unchanged.
+    """
+    response = client.post(
+        "/predict", json={}, headers={"X-Request-ID": "test-request-id"}
+    )
+
+    assert response.status_code == 422
+    assert response.headers["X-Request-ID"] == "test-request-id"
+
+
+def test_metrics_endpoint():
+    """
+    Test the Prometheus metrics endpoint.
+    Verifies that prediction counters are exposed in the text format.
+    """
+    response = client.get("/metrics/")
+
+    assert response.status_code == 200
+    assert "prediction_requests_total" in response.text
+
+
+def test_metrics_endpoint_exact_path():
+    """
+    Test the Prometheus metrics endpoint without a trailing slash.
+    Verifies that /metrics is served directly rather than redirected.
+    """
+    response = client.get("/metrics", follow_redirects=False)
+
+    assert response.status_code == 200
+    assert "prediction_requests_total" in response.text
+
+
+def test_prediction_with_batching():
+    """
+    Test predictions when the app lifespan (and request batcher) is running.
+    Verifies that batched predictions match the unbatched result.
+    """
+    payload = {
+        "MedInc": 5.1,
+        "HouseAge": 12.0,
+        "AveRooms": 6.2,
+        "AveBedrms": 1.0,
+        "Population": 1500.0,
+        "AveOccup": 2.8,
+        "Latitude": 37.4,
+        "Longitude": -121.9
+    }
+    from api.app.routers.prediction import PRED_CACHE
+
+    PRED_CACHE.clear()
+    unbatched = client.post("/predict", json=payload)
+
+    PRED_CACHE.clear()
+    with TestClient(app) as batched_client:
+        batched = batched_client.post("/predict", json=payload)
+
+    assert unbatched.status_code == 200
+    assert batched.status_code == 200
+    assert batched.json() == unbatched.json()
+
+
+def test_zero_population_prediction_failure():
+    """
+    Test a request whose engineered feature cannot be computed.
+    Verifies that Population 0 is reported through the prediction error response.
+    """
+    payload = {
+        "MedInc": 3.5,
+        "HouseAge": 20.0,
+        "AveRooms": 5.0,
+        "AveBedrms": 1.1,
+        "Population": 0.0,
+        "AveOccup": 3.0,
+        "Latitude": 34.05,
+        "Longitude": -118.25
+    }
+
+    response = client.post("/predict", json=payload)
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Prediction failed:")
+
+
+def test_out_of_range_prediction_failure():
+    """
+    Test a finite input too large for the float32 model inputs.
+    Verifies that the request fails cleanly and nothing is cached.
+    """
+    from api.app.routers.prediction import PRED_CACHE
+
+    payload = {
+        "MedInc": 1e40,
+        "HouseAge": 20.0,
+        "AveRooms": 5.0,
+        "AveBedrms": 1.1,
+        "Population": 900.0,
+        "AveOccup": 3.0,
+        "Latitude": 34.05,
+        "Longitude": -118.25
+    }
+    PRED_CACHE.clear()
+
+    response = client.post("/predict", json=payload)
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Prediction failed:")
+    assert len(PRED_CACHE) == 0
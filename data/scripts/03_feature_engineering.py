@@ -14,10 +14,16 @@ Date: 2025
 import argparse
 import os
 import sys
-import pandas as pd
-import numpy as np
 from pathlib import Path
 
+from _common import (
+    create_output_directory,
+    engineer_features,
+    load_data,
+    validate_input_file,
+    write_dataframe,
+)
+
 
 def parse_arguments():
     """
@@ -42,110 +48,42 @@ def parse_arguments():
         "--output-path",
         type=str,
         required=True,
-        help="Path for the feature-engineered CSV output"
+        help="Path for the feature-engineered output (suffix follows --format)"
     )
     
-    return parser.parse_args()
-
-
-def validate_input_file(input_path):
-    """
-    Validate that the input file exists and is readable.
-    
-    Args:
-        input_path (str): Path to input CSV file
-        
-    Raises:
-        FileNotFoundError: If input file doesn't exist
-        ValueError: If file is not a CSV file
-    """
-    if not os.path.exists(input_path):
-        raise FileNotFoundError(f"Input file not found: {input_path}")
-    
-    if not input_path.lower().endswith('.csv'):
-        raise ValueError(f"Input file must be a CSV file: {input_path}")
-    
-    print(f"Input file validated: {input_path}")
-
-
-def load_data(input_path):
-    """
-    Load data from CSV file with error handling.
-    
-    Args:
-        input_path (str): Path to input CSV file
-        
-    Returns:
-        pd.DataFrame: Loaded dataset
-    """
-    try:
-        df = pd.read_csv(input_path)
-        print(f"Data loaded successfully: {df.shape[0]:,} rows × {df.shape[1]} columns")
-        return df
-    except Exception as e:
-        raise RuntimeError(f"Error loading data from {input_path}: {str(e)}")
-
-
-def engineer_features(df):
-    """
-    Perform feature engineering on the dataset.
-    
-    Args:
-        df (pd.DataFrame): Input dataset
-        
-    Returns:
-        pd.DataFrame: Dataset with engineered features
-    """
-    print("Starting feature engineering...")
-    
-    # Create a copy to avoid modifying original data
-    df_processed = df.copy()
-    
-    # Feature engineering: rooms_per_person
-    # Handle division by zero by replacing zero population with small value
-    population_safe = df_processed['Population'].replace(0, 1)
-    df_processed['rooms_per_person'] = df_processed['AveRooms'] * df_processed['AveOccup'] / population_safe
-    
-    # Validate the new feature
-    if df_processed['rooms_per_person'].isnull().any():
-        print("Warning: NaN values detected in rooms_per_person feature")
-        # Handle NaN values if any
-        df_processed['rooms_per_person'].fillna(df_processed['rooms_per_person'].median(), inplace=True)
-    
-    print(f"Feature engineering completed. New shape: {df_processed.shape}")
-    print(f"Created features: rooms_per_person")
-    print(f"   - Mean: {df_processed['rooms_per_person'].mean():.3f}")
-    print(f"   - Median: {df_processed['rooms_per_person'].median():.3f}")
-    print(f"   - Range: {df_processed['rooms_per_person'].min():.3f} - {df_processed['rooms_per_person'].max():.3f}")
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["feather", "parquet", "csv"],
+        default="feather",
+        help="File format for the feature-engineered output"
+    )
     
-    return df_processed
-
-
-def create_output_directory(output_path):
-    """
-    Create output directory if it doesn't exist.
+    parser.add_argument(
+        "--dtype",
+        type=str,
+        choices=["float32", "float64"],
+        default="float32",
+        help="Floating-point type of the feature columns"
+    )
     
-    Args:
-        output_path (str): Path to output file (directory will be created)
-    """
-    output_dir = os.path.dirname(output_path)
-    if output_dir:
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-        print(f"Output directory ready: {output_dir}")
+    return parser.parse_args()
 
 
-def save_engineered_data(df, output_path):
+def save_engineered_data(df, output_path, file_format='feather'):
     """
     Save feature-engineered dataset.
     
     Args:
         df (pd.DataFrame): Feature-engineered dataset
-        output_path (str): Output file path
+        output_path (str): Output file path; its suffix is set from file_format
+        file_format (str): 'feather' (default), 'parquet' or 'csv'
     """
     print("Saving feature-engineered dataset... ")
     
     try:
-        df.to_csv(output_path, index=False)
+        output_path = str(Path(output_path).with_suffix(f'.{file_format}'))
+        write_dataframe(df, output_path, file_format)
         
         # Verify file was created and get its size
         file_size = os.path.getsize(output_path)
@@ -197,22 +135,26 @@ def main():
         print(f"Configuration:")
         print(f"  Input path: {args.input_path}")
         print(f"  Output path: {args.output_path}")
+        print(f"  Format: {args.format}")
+        print(f"  Dtype: {args.dtype}")
         print()
         
         # Validate input file
         validate_input_file(args.input_path)
         
         # Load data
-        df_original = load_data(args.input_path)
+        df_original = load_data(args.input_path, dtype=args.dtype)
         
         # Perform feature engineering
         df_engineered = engineer_features(df_original)
         
         # Create output directory
-        create_output_directory(args.output_path)
+        create_output_directory(os.path.dirname(args.output_path) or '.')
         
         # Save feature-engineered data
-        output_path = save_engineered_data(df_engineered, args.output_path)
+        output_path = save_engineered_data(
+            df_engineered, args.output_path, args.format
+        )
         
         # Print summary
         print_feature_summary(df_original, df_engineered)
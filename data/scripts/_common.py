@@ -0,0 +1,368 @@
+"""
+Shared helpers for the California Housing data pipeline scripts.
+
+Input validation, loading, feature engineering, train/test splitting and
+output writing used by 02_preprocess_data.py, 03_feature_engineering.py and
+04_split_data.py, kept in one place so the scripts stay consistent.
+
+Author: MLOps Project
+Date: 2025
+"""
+
+import os
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from pathlib import Path
+from sklearn.model_selection import ShuffleSplit, StratifiedShuffleSplit
+
+try:
+    # Optional: compiles the feature kernel; NumPy is used when unavailable
+    import numba
+except ImportError:
+    numba = None
+
+
+# Input feature columns; the target is always kept as float64
+FEATURE_COLUMNS = [
+    'MedInc', 'HouseAge', 'AveRooms', 'AveBedrms', 'Population',
+    'AveOccup', 'Latitude', 'Longitude', 'rooms_per_person'
+]
+
+
+def column_types(dtype='float32'):
+    """
+    Explicit column types for CSV inputs: skips per-run type inference.
+
+    Args:
+        dtype (str): Type of the feature columns, 'float32' or 'float64'
+
+    Returns:
+        dict: Column name to pyarrow type
+    """
+    feature_type = pa.from_numpy_dtype(np.dtype(dtype))
+    types = {name: feature_type for name in FEATURE_COLUMNS}
+    types['target'] = pa.float64()
+    return types
+
+
+# Rows per Parquet row group written by write_dataframe
+ROW_GROUP_SIZE = 50_000
+
+
+def validate_input_file(input_path):
+    """
+    Validate that the input file exists and is readable.
+
+    Args:
+        input_path (str): Path to input CSV, Parquet or Feather file
+
+    Raises:
+        FileNotFoundError: If input file doesn't exist
+        ValueError: If file is not a CSV, Parquet or Feather file
+    """
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    if not input_path.lower().endswith(('.csv', '.parquet', '.feather')):
+        raise ValueError(
+            f"Input file must be a CSV, Parquet or Feather file: {input_path}"
+        )
+
+    print(f"✅ Input file validated: {input_path}")
+
+
+def load_data(input_path, required_columns=(), columns=None, dtype='float32'):
+    """
+    Load data from a CSV, Parquet or Feather file with error handling.
+
+    Args:
+        input_path (str): Path to input CSV, Parquet or Feather file
+        required_columns (iterable): Columns that must be present
+        columns (list): Only read these columns (default: all)
+        dtype (str): Type of the feature columns, 'float32' or 'float64'
+
+    Returns:
+        pd.DataFrame: Loaded dataset
+    """
+    try:
+        if input_path.lower().endswith('.parquet'):
+            df = pd.read_parquet(input_path, engine='pyarrow', columns=columns)
+        elif input_path.lower().endswith('.feather'):
+            # Arrow IPC: no parsing or type inference on read
+            df = pd.read_feather(input_path, columns=columns)
+        else:
+            # Multithreaded Arrow CSV parser with the known schema
+            table = pacsv.read_csv(
+                input_path,
+                read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+                convert_options=pacsv.ConvertOptions(
+                    column_types=column_types(dtype), include_columns=columns
+                )
+            )
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+
+        # Cast only the feature columns not already stored as dtype
+        casts = {
+            name: dtype for name in FEATURE_COLUMNS
+            if name in df.columns and df[name].dtype != dtype
+        }
+        if casts:
+            df = df.astype(casts)
+        print(f"📊 Data loaded successfully: {df.shape[0]:,} rows × {df.shape[1]} columns")
+
+        # Validate required columns
+        for column in required_columns:
+            if column not in df.columns:
+                raise ValueError(f"Column '{column}' not found in dataset")
+
+        return df
+    except Exception as e:
+        raise RuntimeError(f"Error loading data from {input_path}: {str(e)}")
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _rooms_per_person_kernel(rooms, occup, pop, out):
+        for i in numba.prange(rooms.shape[0]):
+            p = pop[i] if pop[i] != 0.0 else 1.0
+            out[i] = rooms[i] * occup[i] / p
+
+
+def rooms_per_person(rooms, occup, pop):
+    """
+    Compute AveRooms * AveOccup / Population, treating zero population as 1.
+
+    Uses a parallel numba kernel when numba is installed, else NumPy.
+
+    Args:
+        rooms (np.ndarray): AveRooms values
+        occup (np.ndarray): AveOccup values
+        pop (np.ndarray): Population values
+
+    Returns:
+        np.ndarray: rooms_per_person values
+    """
+    if numba is None:
+        return np.divide(rooms * occup, np.where(pop == 0, 1.0, pop))
+    out = np.empty(rooms.shape[0], dtype=np.result_type(rooms, occup, pop))
+    _rooms_per_person_kernel(rooms, occup, pop, out)
+    return out
+
+
+def engineer_features(df):
+    """
+    Perform feature engineering on the dataset.
+
+    Args:
+        df (pd.DataFrame): Input dataset
+
+    Returns:
+        pd.DataFrame: Dataset with engineered features
+    """
+    print("🔧 Starting feature engineering...")
+
+    # Shallow copy: shares the existing column data and only gains the new
+    # column, so the original frame is left unmodified without a full copy
+    df_processed = df.copy(deep=False)
+
+    # Feature engineering: rooms_per_person
+    # Computed on the underlying arrays; zero population is treated as 1
+    # to avoid division by zero
+    feature = rooms_per_person(
+        df_processed['AveRooms'].to_numpy(copy=False),
+        df_processed['AveOccup'].to_numpy(copy=False),
+        df_processed['Population'].to_numpy(copy=False),
+    )
+
+    # Validate the new feature
+    nan_mask = np.isnan(feature)
+    if nan_mask.any():
+        print("Warning: NaN values detected in rooms_per_person feature")
+        # Handle NaN values if any
+        feature[nan_mask] = np.nanmedian(feature)
+    df_processed['rooms_per_person'] = feature
+
+    # Additional feature engineering steps can be added here
+    # For example:
+    # df_processed['bedrooms_per_room'] = df_processed['AveBedrms'] / df_processed['AveRooms']
+    # df_processed['population_density'] = df_processed['Population'] / (some area measure)
+
+    print(f"Feature engineering completed. New shape: {df_processed.shape}")
+    print(f"Created features: rooms_per_person")
+    # Summary statistics straight from the (NaN-free) feature array
+    print(f"   - Mean: {feature.mean():.3f}")
+    print(f"   - Median: {np.median(feature):.3f}")
+    print(f"   - Range: {feature.min():.3f} - {feature.max():.3f}")
+
+    return df_processed
+
+
+def create_stratification_groups(target_series, n_groups=5):
+    """
+    Create stratification groups based on target variable quantiles.
+
+    Args:
+        target_series (pd.Series): Target variable
+        n_groups (int): Number of stratification groups
+
+    Returns:
+        np.ndarray: Stratification labels
+    """
+    # Same right-closed bins as pd.qcut, without building a Categorical;
+    # the group ids are small, so int8 labels are enough
+    y = target_series.to_numpy()
+    edges = np.quantile(y, np.linspace(0, 1, n_groups + 1)[1:-1])
+    return np.digitize(y, edges, right=True).astype(np.int8)
+
+
+def compute_split_indices(target, test_size=0.2, random_state=42, stratify=False):
+    """
+    Compute train/test row positions from the target column alone.
+
+    Args:
+        target (pd.Series): Target variable
+        test_size (float): Proportion for test set
+        random_state (int): Random seed for reproducibility
+        stratify (bool): Whether to stratify split
+
+    Returns:
+        tuple: (train_idx, test_idx)
+    """
+    print(f"Splitting data (train: {1-test_size:.0%}, test: {test_size:.0%})...")
+
+    # Create stratification groups if requested
+    stratify_labels = None
+    if stratify:
+        try:
+            stratify_labels = create_stratification_groups(target)
+            print("Using stratified sampling based on target quartiles")
+        except Exception as e:
+            print(f"Warning: Could not create stratification groups: {e}")
+            print("   Proceeding with random sampling")
+
+    # Perform train/test split on row positions
+    try:
+        splitter_cls = ShuffleSplit if stratify_labels is None else StratifiedShuffleSplit
+        splitter = splitter_cls(
+            n_splits=1,
+            test_size=test_size,
+            random_state=random_state
+        )
+        (train_idx, test_idx), = splitter.split(np.zeros(len(target)), stratify_labels)
+        return train_idx, test_idx
+
+    except Exception as e:
+        raise RuntimeError(f"Error during train/test split: {str(e)}")
+
+
+def split_data(df, train_idx, test_idx):
+    """
+    Gather training and testing sets from precomputed row positions.
+
+    The frame is converted to Arrow once and both sets are taken from that
+    table, so the writers receive Arrow data and nothing is converted twice.
+
+    Args:
+        df (pd.DataFrame): Dataset to split
+        train_idx (np.ndarray): Row positions of the training set
+        test_idx (np.ndarray): Row positions of the test set
+
+    Returns:
+        tuple: (train_table, test_table) as pa.Table
+    """
+    # Outputs keep the features first and the target last, the column
+    # layout training expects
+    feature_cols = list(df.columns.drop('target'))
+    table = pa.Table.from_pandas(df, preserve_index=False).select(
+        feature_cols + ['target']
+    )
+
+    train_table = table.take(train_idx)
+    test_table = table.take(test_idx)
+
+    print(f"Data split completed:")
+    print(f"   - Training set: {len(train_idx):,} samples")
+    print(f"   - Test set: {len(test_idx):,} samples")
+    print(f"   - Features: {len(feature_cols)} columns")
+
+    return train_table, test_table
+
+
+def save_split_data(train_table, test_table, output_dir, file_format='parquet'):
+    """
+    Save training and testing datasets.
+
+    Args:
+        train_table (pa.Table): Training dataset
+        test_table (pa.Table): Testing dataset
+        output_dir (str): Output directory path
+        file_format (str): 'parquet' (default) or 'csv'
+
+    Returns:
+        tuple: (train_path, test_path)
+    """
+    print("Saving train/test datasets...")
+
+    try:
+        # Define output file paths
+        train_path = os.path.join(output_dir, f'train.{file_format}')
+        test_path = os.path.join(output_dir, f'test.{file_format}')
+
+        # Save datasets
+        write_dataframe(train_table, train_path, file_format)
+        write_dataframe(test_table, test_path, file_format)
+
+        # Verify files were created and get their sizes
+        train_size = os.path.getsize(train_path)
+        test_size = os.path.getsize(test_path)
+
+        print(f"Datasets saved successfully:")
+        print(f"   - Training data: {train_path} ({train_size:,} bytes)")
+        print(f"   - Test data: {test_path} ({test_size:,} bytes)")
+
+        return train_path, test_path
+
+    except Exception as e:
+        raise RuntimeError(f"Error saving split data: {str(e)}")
+
+
+def create_output_directory(output_dir):
+    """
+    Create output directory if it doesn't exist.
+
+    Args:
+        output_dir (str): Path to output directory
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    print(f"Output directory ready: {output_dir}")
+
+
+def write_dataframe(df, output_path, file_format):
+    """
+    Write a dataframe in the requested format.
+
+    Args:
+        df (pd.DataFrame or pa.Table): Dataset to write
+        output_path (str): Output file path
+        file_format (str): 'parquet', 'feather' or 'csv'
+    """
+    # Every writer below is Arrow-based: convert pandas input once
+    if isinstance(df, pa.Table):
+        table = df
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    if file_format == 'parquet':
+        # Stream the table out one row group at a time
+        with pq.ParquetWriter(output_path, table.schema, compression='snappy') as writer:
+            for start in range(0, table.num_rows, ROW_GROUP_SIZE):
+                writer.write_table(table.slice(start, ROW_GROUP_SIZE))
+    elif file_format == 'feather':
+        feather.write_feather(table, output_path, compression='lz4')
+    else:
+        # Multithreaded Arrow CSV writer instead of the Python-level formatter
+        pacsv.write_csv(table, output_path)
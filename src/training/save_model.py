@@ -4,25 +4,44 @@ This script downloads the registered model from MLflow Model Registry
 and saves it as a PKL file for deployment or further use.
 """
 
+import json
 import os
+import pickle
+import shutil
 import sys
-import yaml
+import tempfile
 import joblib
 import mlflow
 import mlflow.sklearn
+from mlflow.models import Model
 from mlflow.tracking import MlflowClient
 import pandas as pd
 from datetime import datetime
 
+try:
+    # Optional: fast LZ4 compression for the saved PKL; zlib is used otherwise
+    import lz4
+except ImportError:
+    lz4 = None
+
+try:
+    # Optional: faster metadata serialization; the stdlib json is used otherwise
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add src directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+# Project paths, resolved once from this file so they do not depend on CWD
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'src', 'config', 'params.yml')
+SAVE_DIR = os.path.join(PROJECT_ROOT, "api/models", "saved_models")
+
+from utils.config import load_config
+from utils.logging import setup_logging
 
-def load_config(config_path):
-    """Load configuration parameters from YAML file."""
-    with open(config_path, 'r') as file:
-        config = yaml.safe_load(file)
-    return config
+logger = setup_logging()
 
 
 def get_latest_model_version(client, model_name):
@@ -37,14 +56,17 @@ def get_latest_model_version(client, model_name):
         dict: Model version information
     """
     try:
-        # Get all versions of the model
-        model_versions = client.search_model_versions(f"name='{model_name}'")
+        # Let the registry sort by version number and return only the latest
+        model_versions = client.search_model_versions(
+            f"name='{model_name}'",
+            max_results=1,
+            order_by=["version_number DESC"]
+        )
         
         if not model_versions:
             raise ValueError(f"No versions found for model '{model_name}'")
         
-        # Sort by version number and get the latest
-        latest_version = max(model_versions, key=lambda x: int(x.version))
+        latest_version = model_versions[0]
         
         return {
             'name': latest_version.name,
@@ -56,7 +78,7 @@ def get_latest_model_version(client, model_name):
         }
         
     except Exception as e:
-        print(f"Error getting latest model version: {str(e)}")
+        logger.error(f"Error getting latest model version: {str(e)}")
         raise
 
 
@@ -71,7 +93,8 @@ def download_and_save_model(model_name, model_version, save_dir, config):
         config (dict): Configuration parameters
         
     Returns:
-        str: Path to the saved PKL file
+        tuple: (file_path, simple_file_path, model) - the saved PKL paths and
+        the loaded model, or None when MLflow's pickle was copied as is
     """
     try:
         # Create save directory if it doesn't exist
@@ -79,70 +102,102 @@ def download_and_save_model(model_name, model_version, save_dir, config):
         
         # Construct model URI for the specific version
         model_uri = f"models:/{model_name}/{model_version}"
-        print(f"Downloading model from URI: {model_uri}")
-        
-        # Load the model from MLflow
-        model = mlflow.sklearn.load_model(model_uri)
-        print(f"Model loaded successfully from MLflow Registry")
+        logger.info(f"Downloading model from URI: {model_uri}")
         
         # Generate filename with timestamp and version
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{model_name}_v{model_version}_{timestamp}.pkl"
         file_path = os.path.join(save_dir, filename)
         
-        # Save model as PKL file using joblib
-        joblib.dump(model, file_path)
-        print(f"Model saved as PKL file: {file_path}")
+        with tempfile.TemporaryDirectory() as local_dir:
+            # Download the model artifacts from MLflow
+            mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=local_dir)
+            sklearn_flavor = Model.load(local_dir).flavors['sklearn']
+            logger.info(f"Model downloaded successfully from MLflow Registry")
+            
+            is_pickle = sklearn_flavor.get('serialization_format') in (
+                mlflow.sklearn.SERIALIZATION_FORMAT_PICKLE,
+                mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE,
+            )
+            if is_pickle and not config['model'].get('compress', False):
+                # MLflow already stored the model as a pickle, which joblib
+                # loads directly: copy it into place without unpickling
+                model = None
+                shutil.copyfile(
+                    os.path.join(local_dir, sklearn_flavor['pickled_model']), file_path
+                )
+            else:
+                # Re-serialize with joblib, LZ4-compressed when model.compress
+                # is enabled in the config
+                model = mlflow.sklearn.load_model(local_dir)
+                compress = 0
+                if config['model'].get('compress', False):
+                    compress = ('lz4', 3) if lz4 is not None else 3
+                joblib.dump(model, file_path, compress=compress, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Model saved as PKL file: {file_path}")
         
-        # Also save a version without timestamp for easy access
+        # Also save a version without timestamp for easy access: a hard link
+        # to the PKL just written, or a plain file copy where links are not
+        # supported, rather than pickling the model again
         simple_filename = f"{model_name}_latest.pkl"
         simple_file_path = os.path.join(save_dir, simple_filename)
-        joblib.dump(model, simple_file_path)
-        print(f"Model also saved as: {simple_file_path}")
+        if os.path.lexists(simple_file_path):
+            os.remove(simple_file_path)
+        try:
+            os.link(file_path, simple_file_path)
+        except OSError:
+            shutil.copyfile(file_path, simple_file_path)
+        logger.info(f"Model also saved as: {simple_file_path}")
         
-        return file_path, simple_file_path
+        return file_path, simple_file_path, model
         
     except Exception as e:
-        print(f"Error downloading and saving model: {str(e)}")
+        logger.error(f"Error downloading and saving model: {str(e)}")
         raise
 
 
-def verify_saved_model(pkl_file_path, X_test_sample=None):
+def verify_saved_model(pkl_file_path, X_test_sample=None, model=None):
     """
     Verify that the saved PKL model can be loaded and used.
     
     Args:
         pkl_file_path (str): Path to the saved PKL file
         X_test_sample: Optional sample data for prediction test
+        model: Optional in-memory model that was just saved; skips
+            reloading the PKL when provided
         
     Returns:
         bool: True if verification successful
     """
     try:
-        # Load the PKL model
-        loaded_model = joblib.load(pkl_file_path)
-        print(f"PKL model loaded successfully from: {pkl_file_path}")
+        if model is not None:
+            loaded_model = model
+            logger.info(f"Verifying in-memory model saved to: {pkl_file_path}")
+        else:
+            # Load the PKL model
+            loaded_model = joblib.load(pkl_file_path)
+            logger.info(f"PKL model loaded successfully from: {pkl_file_path}")
         
         # Check if model has predict method
         if hasattr(loaded_model, 'predict'):
-            print("Model has predict method")
+            logger.info("Model has predict method")
             
             # If sample data provided, test prediction
             if X_test_sample is not None:
                 try:
                     prediction = loaded_model.predict(X_test_sample)
-                    print(f"Test prediction successful. Sample prediction: {prediction[0]:.4f}")
+                    logger.info(f"Test prediction successful. Sample prediction: {prediction[0]:.4f}")
                 except Exception as e:
-                    print(f"Prediction test failed: {e}")
+                    logger.info(f"Prediction test failed: {e}")
                     return False
         else:
-            print("Model does not have predict method")
+            logger.info("Model does not have predict method")
             return False
         
         return True
         
     except Exception as e:
-        print(f"Model verification failed: {str(e)}")
+        logger.info(f"Model verification failed: {str(e)}")
         return False
 
 
@@ -168,89 +223,87 @@ def save_model_metadata(model_info, save_dir):
         
         metadata_file = os.path.join(save_dir, f"{model_info['name']}_metadata.json")
         
-        import json
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        if orjson is not None:
+            with open(metadata_file, 'wb') as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        else:
+            with open(metadata_file, 'w') as f:
+                json.dump(metadata, f, indent=2)
             
-        print(f"Model metadata saved: {metadata_file}")
+        logger.info(f"Model metadata saved: {metadata_file}")
         
     except Exception as e:
-        print(f"Could not save metadata: {str(e)}")
+        logger.info(f"Could not save metadata: {str(e)}")
 
 
 def main():
     """Main model saving pipeline."""
     # Load configuration
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'params.yml')
-    config = load_config(config_path)
+    config = load_config(CONFIG_PATH)
     
     # Set MLflow tracking URI
     mlflow.set_tracking_uri("http://127.0.0.1:5000")
     
     model_name = config['model']['name']
     
-    print("="*60)
-    print("MODEL DOWNLOAD AND SAVE UTILITY")
-    print("="*60)
-    print(f"Model Name: {model_name}")
-    print(f"MLflow URI: {mlflow.get_tracking_uri()}")
+    logger.info("="*60)
+    logger.info("MODEL DOWNLOAD AND SAVE UTILITY")
+    logger.info("="*60)
+    logger.info(f"Model Name: {model_name}")
+    logger.info(f"MLflow URI: {mlflow.get_tracking_uri()}")
     
     try:
         # Initialize MLflow client
         client = MlflowClient()
         
         # Get latest model version
-        print(f"\n🔍 Searching for latest version of model '{model_name}'...")
+        logger.info(f"\n🔍 Searching for latest version of model '{model_name}'...")
         model_info = get_latest_model_version(client, model_name)
         
-        print(f"Found model:")
-        print(f"   Name: {model_info['name']}")
-        print(f"   Version: {model_info['version']}")
-        print(f"   Stage: {model_info['stage']}")
-        print(f"   Run ID: {model_info['run_id']}")
-        print(f"   Created: {model_info['creation_timestamp']}")
+        logger.info(f"Found model:")
+        logger.info(f"   Name: {model_info['name']}")
+        logger.info(f"   Version: {model_info['version']}")
+        logger.info(f"   Stage: {model_info['stage']}")
+        logger.info(f"   Run ID: {model_info['run_id']}")
+        logger.info(f"   Created: {model_info['creation_timestamp']}")
         
         if model_info['tags']:
-            print(f"   Tags: {model_info['tags']}")
+            logger.info(f"   Tags: {model_info['tags']}")
         
-        # Set up save directory
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        save_dir = os.path.join(project_root, "api/models", "saved_models")
-        
-        print(f"\nSaving model to: {save_dir}")
+        logger.info(f"\nSaving model to: {SAVE_DIR}")
         
         # Download and save the model
-        pkl_file_path, simple_file_path = download_and_save_model(
+        pkl_file_path, simple_file_path, model = download_and_save_model(
             model_name=model_info['name'],
             model_version=model_info['version'],
-            save_dir=save_dir,
+            save_dir=SAVE_DIR,
             config=config
         )
         
         # Save model metadata
-        save_model_metadata(model_info, save_dir)
+        save_model_metadata(model_info, SAVE_DIR)
         
         # Verify the saved model
-        print(f"\nVerifying saved model...")
-        verification_success = verify_saved_model(pkl_file_path)
+        logger.info(f"\nVerifying saved model...")
+        verification_success = verify_saved_model(pkl_file_path, model=model)
         
         if verification_success:
-            print(f"\nSUCCESS!")
-            print(f"   Model successfully downloaded and saved as PKL file")
-            print(f"   Main file: {pkl_file_path}")
-            print(f"   Quick access: {simple_file_path}")
-            print(f"   Model is ready for deployment or further use!")
+            logger.info(f"\nSUCCESS!")
+            logger.info(f"   Model successfully downloaded and saved as PKL file")
+            logger.info(f"   Main file: {pkl_file_path}")
+            logger.info(f"   Quick access: {simple_file_path}")
+            logger.info(f"   Model is ready for deployment or further use!")
         else:
-            print(f"\nVERIFICATION FAILED!")
-            print(f"   Model was saved but verification failed")
-            print(f"   Please check the saved file manually")
+            logger.info(f"\nVERIFICATION FAILED!")
+            logger.info(f"   Model was saved but verification failed")
+            logger.info(f"   Please check the saved file manually")
             
     except Exception as e:
-        print(f"\nERROR: {str(e)}")
-        print("Make sure:")
-        print("1. MLflow server is running at http://127.0.0.1:5000")
-        print("2. The model has been trained and registered")
-        print("3. You have the correct model name in params.yml")
+        logger.error(f"\nERROR: {str(e)}")
+        logger.info("Make sure:")
+        logger.info("1. MLflow server is running at http://127.0.0.1:5000")
+        logger.info("2. The model has been trained and registered")
+        logger.info("3. You have the correct model name in params.yml")
 
 
 def save_specific_version(model_name, version):
@@ -264,28 +317,23 @@ def save_specific_version(model_name, version):
     # Set MLflow tracking URI
     mlflow.set_tracking_uri("http://127.0.0.1:5000")
     
-    # Set up save directory
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    save_dir = os.path.join(project_root, "api/models", "saved_models")
-    
     # Load config for consistency
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'params.yml')
-    config = load_config(config_path)
+    config = load_config(CONFIG_PATH)
     
     try:
         # Download and save specific version
-        pkl_file_path, simple_file_path = download_and_save_model(
+        pkl_file_path, simple_file_path, _ = download_and_save_model(
             model_name=model_name,
             model_version=version,
-            save_dir=save_dir,
+            save_dir=SAVE_DIR,
             config=config
         )
         
-        print(f"Specific version {version} saved successfully!")
+        logger.info(f"Specific version {version} saved successfully!")
         return pkl_file_path, simple_file_path
         
     except Exception as e:
-        print(f"Error saving specific version: {str(e)}")
+        logger.error(f"Error saving specific version: {str(e)}")
         raise
 
 
@@ -5,32 +5,40 @@ This script trains multiple models with MLflow experiment tracking.
 
 import os
 import sys
-import yaml
 import pandas as pd
 import joblib
 import mlflow
 import mlflow.sklearn
+from joblib import Parallel, delayed, parallel_backend
 from sklearn.linear_model import LinearRegression
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import numpy as np
 
+try:
+    from sklearn.metrics import root_mean_squared_error
+except ImportError:
+    # scikit-learn < 1.4: RMSE via the squared flag
+    def root_mean_squared_error(y_true, y_pred):
+        return mean_squared_error(y_true, y_pred, squared=False)
+
 # Add src directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from utils.data_loader import load_data, prepare_data
+# Project paths, resolved once from this file so they do not depend on CWD
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'src', 'config', 'params.yml')
 
+from utils.config import load_config
+from utils.data_loader import load_data, prepare_data
+from utils.logging import setup_logging
 
-def load_config(config_path):
-    """Load configuration parameters from YAML file."""
-    with open(config_path, 'r') as file:
-        config = yaml.safe_load(file)
-    return config
+logger = setup_logging()
 
 
 def calculate_metrics(y_true, y_pred):
     """Calculate evaluation metrics."""
-    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
+    rmse = root_mean_squared_error(y_true, y_pred)
     r2 = r2_score(y_true, y_pred)
     return rmse, r2
 
@@ -52,14 +60,16 @@ def train_linear_regression(X_train, y_train, X_test, y_test, config):
         mlflow.log_metric("rmse", rmse)
         mlflow.log_metric("r2_score", r2)
         
-        # Log model
+        # Log model; only the best run is registered, from main(). The format
+        # is explicit because MLflow 3 defaults to skops outside Databricks,
+        # which refuses to load these models' types without an allow-list
         mlflow.sklearn.log_model(
             sk_model=model,
             artifact_path="linear-reg-model",
-            registered_model_name=config['model']['name']
+            serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE
         )
         
-        print(f"Linear Regression - RMSE: {rmse:.4f}, R2: {r2:.4f}")
+        logger.info(f"Linear Regression - RMSE: {rmse:.4f}, R2: {r2:.4f}")
         
         return model, rmse, r2
 
@@ -77,7 +87,11 @@ def train_decision_tree(X_train, y_train, X_test, y_test, config):
             max_depth=max_depth,
             random_state=config['model']['random_state']
         )
-        model.fit(X_train, y_train)
+        # A single tree fits serially; the backend lets tree ensembles
+        # swapped in here fit their estimators on threads (the splitter
+        # releases the GIL) without spawning processes inside this worker
+        with parallel_backend('threading', n_jobs=-1):
+            model.fit(X_train, y_train)
         
         # Make predictions
         y_pred = model.predict(X_test)
@@ -89,43 +103,58 @@ def train_decision_tree(X_train, y_train, X_test, y_test, config):
         mlflow.log_metric("rmse", rmse)
         mlflow.log_metric("r2_score", r2)
         
-        # Log model
+        # Log model; only the best run is registered, from main(). The format
+        # is explicit because MLflow 3 defaults to skops outside Databricks,
+        # which refuses to load these models' types without an allow-list
         mlflow.sklearn.log_model(
             sk_model=model,
             artifact_path="decision-tree-model",
-            registered_model_name=config['model']['name']
+            serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE
         )
         
-        print(f"Decision Tree - RMSE: {rmse:.4f}, R2: {r2:.4f}")
+        logger.info(f"Decision Tree - RMSE: {rmse:.4f}, R2: {r2:.4f}")
         
         return model, rmse, r2
 
 
+def run_experiment(train_fn, X_train, y_train, X_test, y_test, config, tracking_uri):
+    """
+    Run one training function in a worker process.
+    
+    Worker processes do not inherit the parent's logging or MLflow state,
+    so both are set up again before training.
+    """
+    setup_logging()
+    mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_experiment(config['mlflow']['experiment_name'])
+    try:
+        return train_fn(X_train, y_train, X_test, y_test, config)
+    finally:
+        # Workers are reused and not shut down cleanly; push out their output
+        sys.stdout.flush()
+
+
 def main():
     """Main training pipeline."""
     # Load configuration
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'params.yml')
-    config = load_config(config_path)
+    config = load_config(CONFIG_PATH)
     
     # Set MLflow tracking URI and experiment
     mlflow.set_tracking_uri("http://127.0.0.1:5000")
     mlflow.set_experiment(config['mlflow']['experiment_name'])
     
-    print(f"Starting MLflow experiment: {config['mlflow']['experiment_name']}")
-    print(f"MLflow tracking URI: {mlflow.get_tracking_uri()}")
+    logger.info(f"Starting MLflow experiment: {config['mlflow']['experiment_name']}")
+    logger.info(f"MLflow tracking URI: {mlflow.get_tracking_uri()}")
     
     # Load and prepare data
-    print("\nLoading and preparing data...")
-    
-    # Get the project root directory (parent of src)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    logger.info("\nLoading and preparing data...")
     
     # Construct full paths to data files
-    train_path = os.path.join(project_root, config['data']['train_path'])
-    test_path = os.path.join(project_root, config['data']['test_path'])
+    train_path = os.path.join(PROJECT_ROOT, config['data']['train_path'])
+    test_path = os.path.join(PROJECT_ROOT, config['data']['test_path'])
     
-    print(f"Looking for training data at: {train_path}")
-    print(f"Looking for test data at: {test_path}")
+    logger.info(f"Looking for training data at: {train_path}")
+    logger.info(f"Looking for test data at: {test_path}")
     
     train_data = load_data(train_path)
     test_data = load_data(test_path)
@@ -136,94 +165,98 @@ def main():
         target_col=config['data']['target_col']
     )
     
-    print(f"Training data shape: {X_train.shape}")
-    print(f"Test data shape: {X_test.shape}")
+    logger.info(f"Training data shape: {X_train.shape}")
+    logger.info(f"Test data shape: {X_test.shape}")
     
-    # Experiment 1: Linear Regression (Baseline)
-    print("\n" + "="*50)
-    print("EXPERIMENT 1: LINEAR REGRESSION (BASELINE)")
-    print("="*50)
-    
-    lr_model, lr_rmse, lr_r2 = train_linear_regression(
-        X_train, y_train, X_test, y_test, config
-    )
+    # Hand the models float32 C-contiguous features: converted once here
+    # instead of inside each fit/predict, and half the bytes sent to the
+    # worker processes. Targets stay float64 so the fits keep their precision
+    X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+    X_test = np.ascontiguousarray(X_test, dtype=np.float32)
     
+    # Experiment 1: Linear Regression (Baseline)
     # Experiment 2: Decision Tree
-    print("\n" + "="*50)
-    print("EXPERIMENT 2: DECISION TREE REGRESSOR")
-    print("="*50)
+    # The two runs are independent, so they train in parallel processes
+    logger.info("\n" + "="*50)
+    logger.info("EXPERIMENTS: LINEAR REGRESSION (BASELINE) AND DECISION TREE REGRESSOR")
+    logger.info("="*50)
     
-    dt_model, dt_rmse, dt_r2 = train_decision_tree(
-        X_train, y_train, X_test, y_test, config
+    (lr_model, lr_rmse, lr_r2), (dt_model, dt_rmse, dt_r2) = Parallel(
+        n_jobs=2, backend="loky"
+    )(
+        delayed(run_experiment)(
+            train_fn, X_train, y_train, X_test, y_test, config,
+            mlflow.get_tracking_uri()
+        )
+        for train_fn in (train_linear_regression, train_decision_tree)
     )
     
     # Summary
-    print("\n" + "="*50)
-    print("EXPERIMENT SUMMARY")
-    print("="*50)
-    print(f"Linear Regression  - RMSE: {lr_rmse:.4f}, R2: {lr_r2:.4f}")
-    print(f"Decision Tree      - RMSE: {dt_rmse:.4f}, R2: {dt_r2:.4f}")
+    logger.info("\n" + "="*50)
+    logger.info("EXPERIMENT SUMMARY")
+    logger.info("="*50)
+    logger.info(f"Linear Regression  - RMSE: {lr_rmse:.4f}, R2: {lr_r2:.4f}")
+    logger.info(f"Decision Tree      - RMSE: {dt_rmse:.4f}, R2: {dt_r2:.4f}")
     
     # Determine best model
     best_model = "Linear Regression" if lr_rmse < dt_rmse else "Decision Tree"
-    print(f"\nBest performing model: {best_model}")
+    logger.info(f"\nBest performing model: {best_model}")
     
-    print(f"\nTraining completed! Check MLflow UI at http://127.0.0.1:5000")
+    logger.info(f"\nTraining completed! Check MLflow UI at http://127.0.0.1:5000")
     
     # Model Registration: Find and register the best performing model
-    print("\n" + "="*60)
-    print("MODEL REGISTRATION")
-    print("="*60)
+    logger.info("\n" + "="*60)
+    logger.info("MODEL REGISTRATION")
+    logger.info("="*60)
     
     try:
         # Search for runs in the current experiment to find the best model
         experiment = mlflow.get_experiment_by_name(config['mlflow']['experiment_name'])
         
         if experiment is None:
-            print(f"Warning: Experiment '{config['mlflow']['experiment_name']}' not found")
+            logger.warning(f"Warning: Experiment '{config['mlflow']['experiment_name']}' not found")
             return
         
-        # Search runs and sort by RMSE (ascending - best is lowest)
-        runs_df = mlflow.search_runs(
+        client = mlflow.tracking.MlflowClient()
+        
+        # Search runs and sort by RMSE (ascending - best is lowest); only the
+        # best run is needed, fetched as a Run object rather than a DataFrame
+        runs = client.search_runs(
             experiment_ids=[experiment.experiment_id],
             order_by=["metrics.rmse ASC"],
-            max_results=10
+            max_results=1
         )
         
-        if runs_df.empty:
-            print("No runs found in the experiment")
+        if not runs:
+            logger.info("No runs found in the experiment")
             return
         
-        # Get the best run (first row after sorting by RMSE ascending)
-        best_run = runs_df.iloc[0]
-        best_run_id = best_run['run_id']
-        best_rmse = best_run['metrics.rmse']
-        best_r2 = best_run['metrics.r2_score']
-        best_run_name = best_run['tags.mlflow.runName']
+        # Get the best run (first result after sorting by RMSE ascending)
+        best_run = runs[0]
+        best_run_id = best_run.info.run_id
+        best_rmse = best_run.data.metrics['rmse']
+        best_r2 = best_run.data.metrics['r2_score']
+        best_run_name = best_run.data.tags['mlflow.runName']
         
-        print(f"Best performing run identified:")
-        print(f"  Run ID: {best_run_id}")
-        print(f"  Run Name: {best_run_name}")
-        print(f"  RMSE: {best_rmse:.4f}")
-        print(f"  R2 Score: {best_r2:.4f}")
+        logger.info(f"Best performing run identified:")
+        logger.info(f"  Run ID: {best_run_id}")
+        logger.info(f"  Run Name: {best_run_name}")
+        logger.info(f"  RMSE: {best_rmse:.4f}")
+        logger.info(f"  R2 Score: {best_r2:.4f}")
         
         # Find the model artifact path for the best run
-        client = mlflow.tracking.MlflowClient()
-        
-        # Get run details to find artifact URI
-        run_details = client.get_run(best_run_id)
-        artifact_uri = run_details.info.artifact_uri
+        artifact_uri = best_run.info.artifact_uri
         
-        print(f"Run artifact URI: {artifact_uri}")
+        logger.info(f"Run artifact URI: {artifact_uri}")
         
         # Try to list artifacts using the client
         try:
             artifacts = client.list_artifacts(best_run_id)
-            print(f"Available artifacts in best run:")
+            logger.info(f"Available artifacts in best run:")
             for artifact in artifacts:
-                print(f"  - {artifact.path} (is_dir: {artifact.is_dir})")
+                logger.info(f"  - {artifact.path} (is_dir: {artifact.is_dir})")
         except Exception as e:
-            print(f"Could not list artifacts via API: {e}")
+            logger.info(f"Could not list artifacts via API: {e}")
             artifacts = []
         
         # Determine model artifact path based on run name or try common paths
@@ -238,46 +271,32 @@ def main():
         if artifacts:
             for artifact in artifacts:
                 if artifact.path == model_artifact_path:
-                    print(f"Confirmed model artifact exists: {model_artifact_path}")
+                    logger.info(f"Confirmed model artifact exists: {model_artifact_path}")
                     break
             else:
                 # Path not found in artifacts, try to find any model directory
                 for artifact in artifacts:
                     if artifact.is_dir and ('model' in artifact.path.lower() or artifact.path.startswith('m-')):
                         model_artifact_path = artifact.path
-                        print(f"Using found model artifact: {model_artifact_path}")
+                        logger.info(f"Using found model artifact: {model_artifact_path}")
                         break
         
         if model_artifact_path is None:
-            print("Error: Could not determine model artifact path")
+            logger.error("Error: Could not determine model artifact path")
             if artifacts:
-                print("Available artifacts:", [a.path for a in artifacts])
+                logger.info(f"Available artifacts: {[a.path for a in artifacts]}")
             else:
-                print("No artifacts could be listed - this may be a configuration issue")
-            return
-        
-        # Construct the model URI
-        model_uri = f"runs:/{best_run_id}/{model_artifact_path}"
-        print(f"  Model URI: {model_uri}")
-        
-        # Try to load the model first to verify it exists
-        try:
-            print("Verifying model can be loaded...")
-            test_model = mlflow.sklearn.load_model(model_uri)
-            print("Model verification successful")
-        except Exception as e:
-            print(f"Model verification failed: {e}")
-            print("This suggests the model URI is incorrect or the artifact is corrupted")
+                logger.info("No artifacts could be listed - this may be a configuration issue")
             return
         
         # Construct the model URI
         model_uri = f"runs:/{best_run_id}/{model_artifact_path}"
-        print(f"  Model URI: {model_uri}")
+        logger.info(f"  Model URI: {model_uri}")
         
         # Register the best model in MLflow Model Registry
         model_name = config['model']['name']
         
-        print(f"\nRegistering model '{model_name}' in MLflow Model Registry...")
+        logger.info(f"\nRegistering model '{model_name}' in MLflow Model Registry...")
         
         registered_model = mlflow.register_model(
             model_uri=model_uri,
@@ -291,20 +310,20 @@ def main():
             }
         )
         
-        print(f"Model successfully registered!")
-        print(f"   Model Name: {registered_model.name}")
-        print(f"   Model Version: {registered_model.version}")
-        print(f"   Model Stage: {registered_model.current_stage}")
+        logger.info(f"Model successfully registered!")
+        logger.info(f"   Model Name: {registered_model.name}")
+        logger.info(f"   Model Version: {registered_model.version}")
+        logger.info(f"   Model Stage: {registered_model.current_stage}")
         
-        print(f"\nFINAL SUMMARY:")
-        print(f"   Best Model: {best_run_name}")
-        print(f"   Performance: RMSE={best_rmse:.4f}, R2={best_r2:.4f}")
-        print(f"   Registered as: {model_name} v{registered_model.version}")
-        print(f"   Access via MLflow UI: http://127.0.0.1:5000")
+        logger.info(f"\nFINAL SUMMARY:")
+        logger.info(f"   Best Model: {best_run_name}")
+        logger.info(f"   Performance: RMSE={best_rmse:.4f}, R2={best_r2:.4f}")
+        logger.info(f"   Registered as: {model_name} v{registered_model.version}")
+        logger.info(f"   Access via MLflow UI: http://127.0.0.1:5000")
         
     except Exception as e:
-        print(f"Error during model registration: {str(e)}")
-        print("Models were trained successfully, but registration failed.")
+        logger.error(f"Error during model registration: {str(e)}")
+        logger.info("Models were trained successfully, but registration failed.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+Numba kernels for data preparation.
+
+Each kernel is declared with explicit signatures, so numba compiles it when
+this module is imported rather than on the first call, and cache=True keeps
+the compiled code on disk for later processes. Importing this module needs
+numba; data_loader falls back to NumPy when it is not installed.
+"""
+
+import numba
+import numpy as np
+
+# Column-major float32 and float64 feature arrays, as built by data_loader
+_FEATURE_SIGNATURES = [
+    'void(f4[::1, :], f4[::1, :])',
+    'void(f8[::1, :], f8[::1, :])',
+]
+
+# NaN checks must survive optimization, so fill kernels leave out the
+# 'nnan' and 'ninf' fastmath flags
+_NAN_SAFE_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# As above, plus per-column int64 NaN counts for each array
+_FILL_SIGNATURES = [
+    'void(f4[::1, :], f4[::1, :], i8[::1], i8[::1])',
+    'void(f8[::1, :], f8[::1, :], i8[::1], i8[::1])',
+]
+
+
+@numba.njit(fastmath=True, cache=True)
+def _standardize_column(train_values, test_values, j):
+    n_rows = train_values.shape[0]
+    # Welford: mean and variance of the column in one pass
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n_rows):
+        x = train_values[i, j]
+        delta = x - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x - mean)
+    scale = np.sqrt(m2 / n_rows)
+    # Same zero-variance handling as StandardScaler
+    if scale < 10 * np.finfo(np.float64).eps:
+        scale = 1.0
+    for i in range(n_rows):
+        train_values[i, j] = (train_values[i, j] - mean) / scale
+    for i in range(test_values.shape[0]):
+        test_values[i, j] = (test_values[i, j] - mean) / scale
+
+
+@numba.njit(_FEATURE_SIGNATURES, parallel=True, fastmath=True, cache=True)
+def standardize_kernel(train_values, test_values):
+    """
+    Scale both arrays in place with the per-column mean and standard
+    deviation of train_values.
+    """
+    for j in numba.prange(train_values.shape[1]):
+        _standardize_column(train_values, test_values, j)
+
+
+@numba.njit(_FILL_SIGNATURES, parallel=True, fastmath=_NAN_SAFE_FASTMATH, cache=True)
+def fill_standardize_kernel(train_values, test_values, train_missing, test_missing):
+    """
+    Fill NaNs in both arrays with the per-column median of train_values,
+    then scale them in place as standardize_kernel does.
+    
+    Each column is counted, filled and scaled by one thread while it is
+    still in cache; its NaN counts are stored in train_missing and
+    test_missing.
+    """
+    n_rows, n_cols = train_values.shape
+    n_test = test_values.shape[0]
+    for j in numba.prange(n_cols):
+        n_train_nan = 0
+        for i in range(n_rows):
+            if np.isnan(train_values[i, j]):
+                n_train_nan += 1
+        n_test_nan = 0
+        for i in range(n_test):
+            if np.isnan(test_values[i, j]):
+                n_test_nan += 1
+        train_missing[j] = n_train_nan
+        test_missing[j] = n_test_nan
+        
+        if n_train_nan > 0 or n_test_nan > 0:
+            median = np.nanmedian(train_values[:, j])
+            for i in range(n_rows):
+                if np.isnan(train_values[i, j]):
+                    train_values[i, j] = median
+            for i in range(n_test):
+                if np.isnan(test_values[i, j]):
+                    test_values[i, j] = median
+        
+        _standardize_column(train_values, test_values, j)
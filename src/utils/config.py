@@ -0,0 +1,36 @@
+"""
+Configuration loading for California Housing MLOps project.
+This module provides a cached loader for the YAML parameter file shared by
+the training and model saving scripts.
+"""
+
+import os
+from functools import lru_cache
+
+import yaml
+
+# C-implemented LibYAML loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(config_path, mtime):
+    with open(config_path, 'r') as file:
+        return yaml.load(file, Loader=_YAML_LOADER)
+
+
+def load_config(config_path):
+    """
+    Load configuration parameters from YAML file.
+    
+    Parsed configs are cached per file and modification time, so repeated
+    calls only re-read the file after it changes.
+    
+    Args:
+        config_path (str): Path to the YAML configuration file
+        
+    Returns:
+        dict: Configuration parameters
+    """
+    config_path = os.path.abspath(config_path)
+    return _load_config_cached(config_path, os.path.getmtime(config_path))
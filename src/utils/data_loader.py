@@ -5,17 +5,131 @@ This module provides functions to load data and prepare train/test splits.
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 import os
+from itertools import islice
 
+try:
+    # Optional: multithreaded CSV parsing with engine='polars'
+    import polars as pl
+except ImportError:
+    pl = None
 
-def load_data(file_path):
+try:
+    # Optional: pandas' multithreaded pyarrow CSV engine; the C engine otherwise
+    import pyarrow
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+
+try:
+    # Optional: compiled scaling kernels; NumPy is used otherwise
+    from utils._numba_kernels import fill_standardize_kernel, standardize_kernel
+except ImportError:
+    fill_standardize_kernel = standardize_kernel = None
+
+
+# pandas' default missing-value markers, handed to the other CSV parsers so
+# every engine reads the same cells as NaN
+NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+]
+
+
+def _read_csv_polars(file_path, dtypes, nrows):
+    """
+    Parse a CSV file with polars; the conversion to pandas needs pyarrow.
+    """
+    # Known NumPy column types are handed to the parser as the schema;
+    # anything else (e.g. category) is applied to the frame afterwards
+    columns = pl.read_csv(file_path, n_rows=0).columns
+    schema, casts = {}, {}
+    for col, dtype in (dtypes or {}).items():
+        try:
+            schema[col] = pl.Series(np.empty(0, dtype=dtype)).dtype
+        except TypeError:
+            casts[col] = dtype
+    
+    if all(col in schema for col in columns):
+        # Every type is known: no inference pass at all
+        options = {'schema': {col: schema[col] for col in columns}}
+    else:
+        # Infer the remaining types from every row, not polars' default
+        # first 100, so a late non-integer value cannot fail a column
+        options = {'schema_overrides': schema, 'infer_schema_length': None}
+    
+    data = pl.read_csv(
+        file_path, n_rows=nrows, null_values=NA_VALUES, **options
+    ).to_pandas()
+    return data.astype(casts) if casts else data
+
+
+def _read_csv_arrow(file_path, dtypes):
+    """
+    Parse a CSV file with Arrow's multithreaded reader over a memory map.
+    """
+    # NumPy types are handed to the parser; anything else (e.g. category)
+    # is applied to the frame afterwards
+    column_types, casts = {}, {}
+    for col, dtype in (dtypes or {}).items():
+        try:
+            column_types[col] = pyarrow.from_numpy_dtype(np.dtype(dtype))
+        except (TypeError, pyarrow.ArrowNotImplementedError):
+            casts[col] = dtype
+    
+    # Mapping the file lets the page cache back repeated reads, and
+    # self_destruct frees each Arrow column once pandas owns its copy
+    with pyarrow.memory_map(str(file_path)) as source:
+        table = pacsv.read_csv(
+            source,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+            convert_options=pacsv.ConvertOptions(
+                column_types=column_types, null_values=NA_VALUES
+            ),
+        )
+    data = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    return data.astype(casts) if casts else data
+
+
+def _read_csv(file_path, engine, dtypes, nrows):
     """
-    Load data from a CSV file.
+    Parse a CSV file with the fastest parser available.
+    """
+    if engine == 'polars' and pl is not None and pyarrow is not None:
+        return _read_csv_polars(file_path, dtypes, nrows)
+    if nrows is not None:
+        # The pyarrow engine cannot stop early; the C engine stops
+        # parsing after nrows
+        return pd.read_csv(file_path, dtype=dtypes, nrows=nrows)
+    if pyarrow is not None:
+        return _read_csv_arrow(file_path, dtypes)
+    return pd.read_csv(file_path, dtype=dtypes, low_memory=False, cache_dates=True)
+
+
+def load_data(file_path, engine='auto', dtypes=None, nrows=None, use_cache=False):
+    """
+    Load data from a Parquet or CSV file (chosen by file extension).
+    
+    With use_cache, a full CSV read is cached in a Parquet sidecar
+    (``<file>.csv.parquet``) which later loads use for as long as it is newer
+    than the CSV. The sidecar holds the CSV as parsed without ``dtypes``;
+    requested dtypes are applied on every load, so they never leak between
+    calls.
     
     Args:
-        file_path (str): Path to the CSV file
+        file_path (str): Path to the Parquet or CSV file
+        engine (str): CSV parser - 'auto' or 'pandas' (pandas, through
+            Arrow's reader when pyarrow is installed) or 'polars' (opt-in;
+            needs polars and pyarrow, else the pandas path is used)
+        dtypes (dict): Optional column types for CSV inputs, e.g. when the
+            schema is known; pandas then skips type inference
+        nrows (int): Optional row cap; reading stops once it is reached
+        use_cache (bool): Read and write the Parquet sidecar next to CSV
+            inputs (requires pyarrow); off by default so loading never writes
+            into the data directory
         
     Returns:
         pd.DataFrame: Loaded dataframe
@@ -28,7 +142,33 @@ def load_data(file_path):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Data file not found: {file_path}")
             
-        data = pd.read_csv(file_path)
+        if str(file_path).lower().endswith('.parquet'):
+            if nrows is None:
+                data = pd.read_parquet(file_path, engine='pyarrow')
+            else:
+                # Decode only the first batch of rows, not every row group
+                parquet_file = pq.ParquetFile(file_path)
+                batches = islice(parquet_file.iter_batches(batch_size=nrows), 1)
+                data = pyarrow.Table.from_batches(
+                    batches, schema=parquet_file.schema_arrow
+                ).to_pandas()
+        elif use_cache and nrows is None and pyarrow is not None:
+            cache_path = f"{file_path}.parquet"
+            if (os.path.exists(cache_path)
+                    and os.path.getmtime(cache_path) >= os.path.getmtime(file_path)):
+                data = pd.read_parquet(cache_path, engine='pyarrow')
+                print(f"Using cached Parquet copy: {cache_path}")
+            else:
+                data = _read_csv(file_path, engine, None, nrows)
+                try:
+                    data.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=False)
+                except OSError as e:
+                    # A read-only data directory only loses the cache
+                    print(f"Warning: could not write Parquet cache {cache_path}: {e}")
+            if dtypes:
+                data = data.astype(dtypes)
+        else:
+            data = _read_csv(file_path, engine, dtypes, nrows)
         print(f"Data loaded successfully from {file_path}")
         print(f"Shape: {data.shape}")
         
@@ -39,7 +179,102 @@ def load_data(file_path):
         raise
 
 
-def prepare_data(train_data, test_data, target_col, scale_features=True, id_col='ID'):
+def standardize(train_values, test_values, copy=True):
+    """
+    Scale features to zero mean and unit variance using training statistics.
+    
+    Uses a parallel numba kernel when numba is installed, else in-place
+    NumPy ufuncs.
+    
+    Args:
+        train_values (np.ndarray): Training features, 2D
+        test_values (np.ndarray): Test features, 2D
+        copy (bool): If False, float arrays are scaled in place
+        
+    Returns:
+        tuple: (train_scaled, test_scaled)
+    """
+    # Scaled in place on column-major arrays (the layout the compiled kernel
+    # is declared for), keeping float32 inputs at their precision
+    dtype = np.float32 if train_values.dtype == np.float32 else np.float64
+    train_scaled = np.array(train_values, dtype=dtype, order='F', copy=copy)
+    test_scaled = np.array(test_values, dtype=dtype, order='F', copy=copy)
+    
+    if standardize_kernel is not None:
+        standardize_kernel(train_scaled, test_scaled)
+        return train_scaled, test_scaled
+    
+    # Center in place first, so the variance is read from the centered
+    # values in one more pass instead of std() recomputing the mean and
+    # allocating a deviations array; statistics accumulate in float64
+    mean = train_scaled.mean(axis=0, dtype=np.float64).astype(dtype)
+    np.subtract(train_scaled, mean, out=train_scaled)
+    np.subtract(test_scaled, mean, out=test_scaled)
+    
+    # Same zero-variance handling as StandardScaler
+    sum_sq = np.einsum('ij,ij->j', train_scaled, train_scaled, dtype=np.float64)
+    scale = np.sqrt(sum_sq / max(train_scaled.shape[0], 1))
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+    scale = scale.astype(dtype)
+    
+    # out= ufuncs: no scaled temporaries are allocated
+    np.divide(train_scaled, scale, out=train_scaled)
+    np.divide(test_scaled, scale, out=test_scaled)
+    return train_scaled, test_scaled
+
+
+def _column_array(df, columns, dtype, rows=None):
+    """
+    Copy columns of a frame into one column-major array of the given dtype,
+    optionally gathering only the given row positions.
+    """
+    n_rows = len(df) if rows is None else len(rows)
+    values = np.empty((n_rows, len(columns)), dtype=dtype, order='F')
+    for j, col in enumerate(columns):
+        column = df[col].to_numpy()
+        values[:, j] = column if rows is None else np.take(column, rows)
+    return values
+
+
+def _fill_missing(train_values, test_values):
+    """
+    Fill NaNs in both arrays in place with the per-column training median.
+    
+    Returns:
+        tuple: (missing_train, missing_test) counts of filled values
+    """
+    # One vectorized check per array settles the common NaN-free case
+    # before anything is counted
+    if not (np.isnan(train_values).any() or np.isnan(test_values).any()):
+        return 0, 0
+    
+    train_nan = np.isnan(train_values)
+    test_nan = np.isnan(test_values)
+    
+    # Training medians, only for the columns that need filling; the masks
+    # then write them in place, broadcast along each row
+    fill_cols = np.flatnonzero(train_nan.any(axis=0) | test_nan.any(axis=0))
+    train_medians = np.zeros(train_values.shape[1], dtype=train_values.dtype)
+    train_medians[fill_cols] = np.nanmedian(train_values[:, fill_cols], axis=0)
+    np.copyto(train_values, train_medians, where=train_nan)
+    np.copyto(test_values, train_medians, where=test_nan)
+    return int(train_nan.sum()), int(test_nan.sum())
+
+
+def _feature_frame(data, feature_cols, numeric_cols, values):
+    """
+    Build the feature frame from the processed numeric column array.
+    """
+    frame = pd.DataFrame(values, columns=numeric_cols, index=data.index)
+    if len(numeric_cols) == len(feature_cols):
+        return frame
+    # Non-numeric features are passed through unchanged
+    other_cols = [col for col in feature_cols if col not in frame.columns]
+    return pd.concat([frame, data.loc[:, other_cols]], axis=1)[feature_cols]
+
+
+def prepare_data(train_data, test_data, target_col, scale_features=True, id_col='ID',
+                 dtype=np.float32, verbose=False, copy_targets=False):
     """
     Prepare training and testing data by separating features and target.
     Automatically identifies and excludes non-feature columns (ID, target).
@@ -48,8 +283,14 @@ def prepare_data(train_data, test_data, target_col, scale_features=True, id_col=
         train_data (pd.DataFrame): Training dataset
         test_data (pd.DataFrame): Testing dataset  
         target_col (str): Name of the target column
-        scale_features (bool): Whether to scale features using StandardScaler
+        scale_features (bool): Whether to standardize numeric features
         id_col (str): Name of the ID column to exclude from features
+        dtype (np.dtype): Floating-point type of the numeric features
+            (default float32; np.float64 keeps double precision)
+        verbose (bool): Also print the feature ranges after scaling, which
+            costs extra passes over the training features
+        copy_targets (bool): Return copies of the target columns; by default
+            y_train and y_test share memory with the input frames
         
     Returns:
         tuple: (X_train, y_train, X_test, y_test)
@@ -76,51 +317,58 @@ def prepare_data(train_data, test_data, target_col, scale_features=True, id_col=
         print(f"Feature columns identified: {feature_cols}")
         print(f"Number of features: {len(feature_cols)}")
             
-        # Separate features and target
-        X_train = train_data[feature_cols].copy()
-        y_train = train_data[target_col].copy()
+        # Separate targets; they are not modified here, so they are only
+        # copied on request
+        y_train = train_data[target_col]
+        y_test = test_data[target_col]
+        if copy_targets:
+            y_train = y_train.copy()
+            y_test = y_test.copy()
         
-        X_test = test_data[feature_cols].copy()
-        y_test = test_data[target_col].copy()
+        # Numeric feature columns, found once from the dtypes of an empty
+        # row slice so no feature data is copied
+        numeric_cols = train_data.iloc[:0][feature_cols].select_dtypes(include=[np.number]).columns
         
-        # Handle missing values if any
-        missing_train = X_train.isnull().sum().sum()
-        missing_test = X_test.isnull().sum().sum()
+        # Numeric features are copied once into column-major arrays of the
+        # working precision; filling and scaling then run on contiguous
+        # columns and the frames are only rebuilt at the end
+        train_values = _column_array(train_data, numeric_cols, dtype)
+        test_values = _column_array(test_data, numeric_cols, dtype)
+        
+        # With numba, missing values are filled and the features scaled in
+        # one fused kernel call; otherwise NumPy fills, then standardizes
+        fused = (scale_features and len(numeric_cols) > 0
+                 and fill_standardize_kernel is not None)
+        if fused:
+            train_missing = np.zeros(len(numeric_cols), dtype=np.int64)
+            test_missing = np.zeros(len(numeric_cols), dtype=np.int64)
+            fill_standardize_kernel(train_values, test_values, train_missing, test_missing)
+            missing_train = int(train_missing.sum())
+            missing_test = int(test_missing.sum())
+        else:
+            missing_train, missing_test = _fill_missing(train_values, test_values)
         
         if missing_train > 0:
             print(f"Warning: {missing_train} missing values found in training features. Filling with median.")
-            # Fill missing values with median for numeric columns
-            numeric_cols = X_train.select_dtypes(include=[np.number]).columns
-            X_train[numeric_cols] = X_train[numeric_cols].fillna(X_train[numeric_cols].median())
-            
         if missing_test > 0:
             print(f"Warning: {missing_test} missing values found in test features. Filling with training median.")
-            # Use training data median for test data
-            numeric_cols = X_test.select_dtypes(include=[np.number]).columns
-            train_medians = X_train[numeric_cols].median()
-            X_test[numeric_cols] = X_test[numeric_cols].fillna(train_medians)
         
         # Scale features if requested
         if scale_features:
             # Only scale numeric features
-            numeric_cols = X_train.select_dtypes(include=[np.number]).columns
-            
             if len(numeric_cols) > 0:
-                scaler = StandardScaler()
-                X_train_scaled = X_train.copy()
-                X_test_scaled = X_test.copy()
-                
-                # Scale only numeric columns
-                X_train_scaled[numeric_cols] = scaler.fit_transform(X_train[numeric_cols])
-                X_test_scaled[numeric_cols] = scaler.transform(X_test[numeric_cols])
+                if not fused:
+                    train_values, test_values = standardize(train_values, test_values, copy=False)
                 
-                X_train = X_train_scaled
-                X_test = X_test_scaled
-                
-                print(f"Scaled {len(numeric_cols)} numeric features using StandardScaler")
+                print(f"Scaled {len(numeric_cols)} numeric features to zero mean and unit variance")
             else:
                 print("No numeric features found to scale")
         
+        # Rebuild the feature frames; a column-major array becomes the
+        # frame's block without another copy
+        X_train = _feature_frame(train_data, feature_cols, numeric_cols, train_values)
+        X_test = _feature_frame(test_data, feature_cols, numeric_cols, test_values)
+        
         # Display feature statistics
         print(f"\nData preparation completed:")
         print(f"  X_train shape: {X_train.shape}")
@@ -128,13 +376,17 @@ def prepare_data(train_data, test_data, target_col, scale_features=True, id_col=
         print(f"  X_test shape: {X_test.shape}")
         print(f"  y_test shape: {y_test.shape}")
         
-        # Show feature ranges after scaling
-        if scale_features and len(X_train.select_dtypes(include=[np.number]).columns) > 0:
+        # Show feature ranges after scaling (opt-in)
+        if verbose and scale_features and len(numeric_cols) > 0:
             print(f"  Feature ranges after scaling:")
-            numeric_features = X_train.select_dtypes(include=[np.number])
-            print(f"    Min: {numeric_features.min().min():.4f}")
-            print(f"    Max: {numeric_features.max().max():.4f}")
-            print(f"    Mean: {numeric_features.mean().mean():.4f}")
+            # Per-column reductions on the numeric array, then scalar
+            # reductions over the short per-column vectors
+            col_min = train_values.min(axis=0)
+            col_max = train_values.max(axis=0)
+            col_mean = train_values.mean(axis=0, dtype=np.float64)
+            print(f"    Min: {col_min.min():.4f}")
+            print(f"    Max: {col_max.max():.4f}")
+            print(f"    Mean: {col_mean.mean():.4f}")
         
         return X_train, y_train, X_test, y_test
         
@@ -153,11 +405,15 @@ def load_and_split_data(file_path, target_col, test_size=0.2, random_state=42, s
         target_col (str): Name of the target column
         test_size (float): Proportion of data to use for testing (default: 0.2)
         random_state (int): Random state for reproducible splits
-        scale_features (bool): Whether to scale features using StandardScaler
+        scale_features (bool): Whether to standardize numeric features
         
     Returns:
         tuple: (X_train, y_train, X_test, y_test)
     """
+    # Imported here: scikit-learn is only needed for this split, and keeps
+    # module import fast for load_data/prepare_data consumers
+    from sklearn.model_selection import train_test_split
+    
     try:
         # Load the data
         data = load_data(file_path)
@@ -166,31 +422,37 @@ def load_and_split_data(file_path, target_col, test_size=0.2, random_state=42, s
         if target_col not in data.columns:
             raise KeyError(f"Target column '{target_col}' not found in data")
             
-        X = data.drop(columns=[target_col])
-        y = data[target_col]
+        feature_cols = [col for col in data.columns if col != target_col]
+        dtype = np.result_type(*data.dtypes[feature_cols])
         
-        # Split the data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state
+        # Split row positions only, then gather each column once into the
+        # train and test arrays instead of fancy-indexing four DataFrames
+        train_idx, test_idx = train_test_split(
+            np.arange(len(data)), test_size=test_size, random_state=random_state
         )
+        train_values = _column_array(data, feature_cols, dtype, rows=train_idx)
+        test_values = _column_array(data, feature_cols, dtype, rows=test_idx)
         
         # Handle missing values if any
-        if X_train.isnull().sum().sum() > 0:
+        train_nan = np.isnan(train_values)
+        if train_nan.any():
             print("Warning: Missing values found. Filling with median.")
-            X_train = X_train.fillna(X_train.median())
-            X_test = X_test.fillna(X_train.median())  # Use training median for test set
+            # Use training median for both sets
+            train_medians = np.nanmedian(train_values, axis=0)
+            np.copyto(train_values, train_medians, where=train_nan)
+            np.copyto(test_values, train_medians, where=np.isnan(test_values))
         
         # Scale features if requested
         if scale_features:
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-            
-            # Convert back to DataFrame
-            X_train = pd.DataFrame(X_train_scaled, columns=X_train.columns, index=X_train.index)
-            X_test = pd.DataFrame(X_test_scaled, columns=X_test.columns, index=X_test.index)
-            
-            print("Features scaled using StandardScaler")
+            train_values, test_values = standardize(train_values, test_values, copy=False)
+            print("Features scaled to zero mean and unit variance")
+        
+        # Wrap the arrays, keeping the original row labels
+        X_train = pd.DataFrame(train_values, columns=feature_cols, index=data.index[train_idx])
+        X_test = pd.DataFrame(test_values, columns=feature_cols, index=data.index[test_idx])
+        y_values = data[target_col].to_numpy()
+        y_train = pd.Series(y_values[train_idx], index=X_train.index, name=target_col)
+        y_test = pd.Series(y_values[test_idx], index=X_test.index, name=target_col)
         
         print(f"Data loaded and split:")
         print(f"  X_train shape: {X_train.shape}")
@@ -215,13 +477,27 @@ def get_data_info(data):
     Returns:
         dict: Dictionary containing data information
     """
+    # Column kinds from the dtypes of an empty row slice: no data is copied
+    empty = data.iloc[:0]
+    
+    # Missing values counted on each column's array; NumPy integer and
+    # bool columns cannot hold any
+    missing_values = {}
+    for col, dtype in data.dtypes.items():
+        if not isinstance(dtype, np.dtype) or dtype.kind not in 'iubf':
+            missing_values[col] = int(data[col].isna().sum())
+        elif dtype.kind == 'f':
+            missing_values[col] = int(np.isnan(data[col].to_numpy()).sum())
+        else:
+            missing_values[col] = 0
+    
     info = {
         'shape': data.shape,
         'columns': list(data.columns),
         'dtypes': data.dtypes.to_dict(),
-        'missing_values': data.isnull().sum().to_dict(),
-        'numeric_columns': list(data.select_dtypes(include=[np.number]).columns),
-        'categorical_columns': list(data.select_dtypes(include=['object']).columns)
+        'missing_values': missing_values,
+        'numeric_columns': list(empty.select_dtypes(include=[np.number]).columns),
+        'categorical_columns': list(empty.select_dtypes(include=['object']).columns)
     }
     
     return info
@@ -253,8 +529,10 @@ def validate_data(data, target_col):
         validation_results['is_valid'] = False
         validation_results['issues'].append("Dataset is empty")
     
-    # Check for duplicate rows
-    duplicates = data.duplicated().sum()
+    # Check for duplicate rows on one 64-bit hash per row; the count is the
+    # number of repeated hashes, so no per-row duplicate mask is built
+    row_hashes = pd.util.hash_pandas_object(data, index=False)
+    duplicates = len(row_hashes) - row_hashes.nunique()
     if duplicates > 0:
         validation_results['issues'].append(f"Found {duplicates} duplicate rows")
     
@@ -0,0 +1,47 @@
+"""
+Logging setup for California Housing MLOps project.
+This module configures the console logger shared by the training and model
+saving scripts.
+"""
+
+import logging
+import sys
+
+LOGGER_NAME = "training"
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that does not flush the stream after every record.
+    
+    Output is left to the stream's own buffering (block-buffered when stdout
+    is piped to a file or CI log) and flushed by logging.shutdown() at exit.
+    """
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+def setup_logging(level=logging.INFO):
+    """
+    Configure the shared logger to write bare messages to stdout.
+    
+    Safe to call more than once, e.g. again from a worker process.
+    
+    Args:
+        level (int): Minimum level to emit
+        
+    Returns:
+        logging.Logger: The configured logger
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if not any(isinstance(h, BufferedStreamHandler) for h in logger.handlers):
+        handler = BufferedStreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger